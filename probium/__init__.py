@@ -1,8 +1,8 @@
 from importlib.metadata import entry_points, version
 from typing import TYPE_CHECKING
-from .core import detect, scan_dir, list_engines
+from .core import detect, scan_dir, scan_dir_incremental, list_engines
 from .google_magika import detect_magika
-from .magic_service import detect_magic
+from .magic_service import detect_magic, register_signature
 from .trid_multi import detect_with_trid
 from .exceptions import EngineFailure, FastbackError, UnsupportedType
 from .registry import register
@@ -14,6 +14,7 @@ def watch(*args, **kw):
 __all__ = [
     "detect",
     "scan_dir",
+    "scan_dir_incremental",
     "list_engines",
     "register",
     "FastbackError",
@@ -21,6 +22,7 @@ __all__ = [
     "EngineFailure",
     "detect_with_trid",
     "detect_magic",
+    "register_signature",
     "detect_magika",
     "watch",
 
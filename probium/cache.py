@@ -1,6 +1,12 @@
 # probium/cache.py  – thread-safe SQLite + small in-mem LRU
 from __future__ import annotations
+import atexit
+import json
+import logging
+import os
+import queue
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Optional
@@ -9,8 +15,9 @@ from platformdirs import user_cache_dir
 from cachetools import LRUCache
 from threading import RLock
 
-from .models import Result
+from .models import Candidate, Result
 
+logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path(user_cache_dir("probium"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -18,17 +25,72 @@ DB = CACHE_DIR / "results.sqlite3"
 
 _DB_TIMEOUT = 30.0
 
+# bump when the layout of table ``r`` changes; older tables are dropped
+_SCHEMA_VERSION = 3
+
+# write-behind tuning: rows are grouped into one transaction until either
+# limit is reached. Both values are read on every batch so they can be
+# adjusted at runtime.
+FLUSH_INTERVAL = 0.5  # seconds
+FLUSH_SIZE = 512  # rows
+
 
 def _init_db() -> None:
     """Create the cache database if needed."""
     with sqlite3.connect(DB, timeout=_DB_TIMEOUT) as con:
         con.execute("PRAGMA journal_mode=WAL")
-        con.execute("CREATE TABLE IF NOT EXISTS r (p TEXT PRIMARY KEY, t REAL, j TEXT)")
+        (version,) = con.execute("PRAGMA user_version").fetchone()
+        if version < _SCHEMA_VERSION:
+            con.execute("DROP TABLE IF EXISTS r")
+            con.execute("DROP TABLE IF EXISTS h")
+        # p: path, c: detection options tag, t: write time,
+        # m/s/i/d: st_mtime_ns, st_size, st_ino, st_dev, j: Result JSON
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS r ("
+            "p TEXT, c TEXT, t REAL, m INTEGER, s INTEGER, i INTEGER, d INTEGER, "
+            "j TEXT, PRIMARY KEY (p, c))"
+        )
+        # content-addressed results: k is "<payload digest>:<options tag>"
+        con.execute("CREATE TABLE IF NOT EXISTS h (k TEXT PRIMARY KEY, t REAL, j TEXT)")
+        con.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
         con.commit()
 
 
+# Long-lived connections, one per thread. ``_generation`` is bumped when the
+# database file is recreated so stale handles are reopened lazily.
+_local = threading.local()
+_generation = 0
+
+
+def _connect() -> sqlite3.Connection:
+    """Return this thread's cache connection, opening it on first use."""
+    con = getattr(_local, "con", None)
+    if (
+        con is not None
+        and _local.generation == _generation
+        and _local.pid == os.getpid()
+    ):
+        return con
+    con = sqlite3.connect(DB, timeout=_DB_TIMEOUT)
+    # WAL only needs to sync on checkpoints at this level
+    con.execute("PRAGMA synchronous=NORMAL")
+    _local.con = con
+    _local.generation = _generation
+    _local.pid = os.getpid()
+    return con
+
+
 def _reset_db() -> None:
     """Remove a corrupted cache database and recreate it."""
+    global _generation
+    con = getattr(_local, "con", None)
+    if con is not None:
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+        _local.con = None
+    _generation += 1
     try:
         DB.unlink()
     except FileNotFoundError:
@@ -42,7 +104,10 @@ def _reset_db() -> None:
 
 _init_db()
 
-_mem: LRUCache[str, str] = LRUCache(maxsize=1024)
+_mem: LRUCache[tuple[str, str], tuple[tuple[int, int, int, int], str]] = LRUCache(
+    maxsize=1024
+)
+_mem_content: LRUCache[str, str] = LRUCache(maxsize=1024)
 _mem_lock = RLock()
 TTL = 24 * 3600  # 1 day
 
@@ -56,51 +121,220 @@ def _ser(res: Result) -> str:
 
 
 def _des(raw: str) -> Result:
-    return Result.model_validate_json(raw)
+    data = json.loads(raw)
+    data["candidates"] = [Candidate(**c) for c in data.get("candidates") or ()]
+    return Result(**data)
+
+
+def _key(path: Path) -> str:
+    # abspath is a string operation; resolve() would lstat every component
+    return os.path.abspath(path)
+
+
+def stat_sig(st: os.stat_result) -> tuple[int, int, int, int]:
+    """Return the ``(mtime_ns, size, inode, device)`` tuple a row is valid for."""
+    return st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev
+
+
+_PUT_PATH = (
+    "INSERT OR REPLACE INTO r (p, c, t, m, s, i, d, j) VALUES (?,?,?,?,?,?,?,?)"
+)
+_PUT_CONTENT = "INSERT OR REPLACE INTO h (k, t, j) VALUES (?,?,?)"
 
 
-def get(path: Path) -> Optional[Result]:
-    """Return a cached :class:`Result` for ``path`` if present."""
+class _Writer(threading.Thread):
+    """Background thread that batches cache rows into single transactions."""
+
+    def __init__(self) -> None:
+        super().__init__(name="probium-cache-writer", daemon=True)
+        self.queue: queue.Queue = queue.Queue()
+        # a forked child inherits this object but never the thread behind it
+        self.pid = os.getpid()
+
+    def running(self) -> bool:
+        """Whether this writer's thread is alive in the current process."""
+        return self.pid == os.getpid() and self.is_alive()
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            rows: dict[str, list[tuple]] = {}
+            count = 0
+            waiters: list[threading.Event] = []
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while True:
+                if isinstance(item, threading.Event):
+                    # flush() marker: write what we have and wake the caller
+                    waiters.append(item)
+                    break
+                sql, row = item
+                rows.setdefault(sql, []).append(row)
+                count += 1
+                if count >= FLUSH_SIZE:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if rows:
+                self._write(rows)
+            for ev in waiters:
+                ev.set()
+
+    @staticmethod
+    def _write(rows: dict[str, list[tuple]]) -> None:
+        try:
+            con = _connect()
+            with con:
+                for sql, batch in rows.items():
+                    con.executemany(sql, batch)
+        except sqlite3.DatabaseError:
+            _reset_db()
+        except Exception:  # pragma: no cover - keep the writer alive
+            logger.exception("cache write failed")
+
+
+_writer: _Writer | None = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _Writer:
+    """Return the running writer, starting one in this process if needed."""
+    global _writer
+    w = _writer
+    if w is not None and w.running():
+        return w
+    with _writer_lock:
+        if _writer is None or not _writer.running():
+            _writer = _Writer()
+            _writer.start()
+        return _writer
+
+
+def flush(timeout: float | None = None) -> None:
+    """Block until rows queued by :func:`put` have been written."""
+    w = _writer
+    if w is None or not w.running():
+        return
+    done = threading.Event()
+    w.queue.put(done)
+    done.wait(timeout)
 
-    key = str(path.resolve())
+
+atexit.register(flush)
+
+
+def get(
+    path: Path, *, tag: str = "", st: os.stat_result | None = None
+) -> Optional[Result]:
+    """Return a cached :class:`Result` for ``path`` if it is still valid.
+
+    A row only hits when it was stored with the same options ``tag`` and the
+    file's mtime, size, inode and device still match. ``st`` may be passed
+    to reuse a stat the caller already has; otherwise one ``os.stat`` is
+    made.
+    """
+
+    key = (_key(path), tag)
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+    sig = stat_sig(st)
 
     # L1: RAM
     with _mem_lock:
-        if key in _mem:
-            return _des(_mem[key])
+        hit = _mem.get(key)
+    if hit is not None:
+        return _des(hit[1]) if hit[0] == sig else None
 
-    # L2: SQLite (own connection per thread)
+    # L2: SQLite (long-lived connection per thread)
     try:
-
-        with sqlite3.connect(DB, timeout=_DB_TIMEOUT) as con:
-            row = con.execute("SELECT t, j FROM r WHERE p = ?", (key,)).fetchone()
-            if not row:
-                return None
-            ts, raw = row
-            if _now() - ts > TTL:
-                return None
+        row = _connect().execute(
+            "SELECT t, m, s, i, d, j FROM r WHERE p = ? AND c = ?", key
+        ).fetchone()
+        if not row:
+            return None
+        ts, *row_sig, raw = row
+        if tuple(row_sig) != sig or _now() - ts > TTL:
+            return None
     except sqlite3.DatabaseError:
         _reset_db()
         return None
 
     with _mem_lock:
-        _mem[key] = raw
+        _mem[key] = (sig, raw)
     return _des(raw)
 
 
-def put(path: Path, result: Result) -> None:
-    """Store ``result`` in the on-disk and in-memory caches."""
+def put(
+    path: Path,
+    result: Result,
+    *,
+    tag: str = "",
+    st: os.stat_result | None = None,
+) -> None:
+    """Store ``result`` in the in-memory cache and queue it for SQLite.
 
-    key = str(path.resolve())
+    ``st`` should be the stat taken *before* the file was read so a write
+    racing with detection invalidates the row. Rows are written by a
+    background thread in batches of up to :data:`FLUSH_SIZE` rows or every
+    :data:`FLUSH_INTERVAL` seconds; call :func:`flush` to wait for pending
+    writes.
+    """
+
+    key = (_key(path), tag)
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+    sig = stat_sig(st)
     raw = _ser(result)
     with _mem_lock:
-        _mem[key] = raw
+        _mem[key] = (sig, raw)
+    _get_writer().queue.put((_PUT_PATH, (*key, _now(), *sig, raw)))
+
+
+def get_content(digest: str, *, tag: str = "") -> Optional[Result]:
+    """Return the cached :class:`Result` for a payload digest if present.
+
+    Entries are keyed by the digest of the scanned bytes and the detection
+    options ``tag`` only, so copies of the same content share one row no
+    matter which path, engine call or process produced it.
+    """
+
+    key = f"{digest}:{tag}"
+    with _mem_lock:
+        raw = _mem_content.get(key)
+    if raw is not None:
+        return _des(raw)
+
     try:
-        with sqlite3.connect(DB, timeout=_DB_TIMEOUT) as con:
-            con.execute(
-                "INSERT OR REPLACE INTO r (p, t, j) VALUES (?,?,?)",
-                (key, _now(), raw),
-            )
-            con.commit()
+        row = _connect().execute("SELECT t, j FROM h WHERE k = ?", (key,)).fetchone()
+        if not row:
+            return None
+        ts, raw = row
+        if _now() - ts > TTL:
+            return None
     except sqlite3.DatabaseError:
         _reset_db()
+        return None
+
+    with _mem_lock:
+        _mem_content[key] = raw
+    return _des(raw)
+
+
+def put_content(digest: str, result: Result, *, tag: str = "") -> None:
+    """Store ``result`` under the payload ``digest`` and options ``tag``."""
+
+    key = f"{digest}:{tag}"
+    raw = _ser(result)
+    with _mem_lock:
+        _mem_content[key] = raw
+    _get_writer().queue.put((_PUT_CONTENT, (key, _now(), raw)))
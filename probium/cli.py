@@ -5,7 +5,7 @@ import sys
 import os
 import asyncio
 from pathlib import Path
-from .core import detect, _detect_file, scan_dir
+from .core import detect, _detect_file, scan_dir, scan_dir_incremental
 
 from .google_magika import detect_magika, require_magika
 
@@ -51,6 +51,8 @@ def cmd_detect(ns: argparse.Namespace) -> None:
             extensions=ns.ext,
             ignore=ns.ignore,
             no_cap=ns.nocap,
+            max_pending=ns.max_pending,
+            ordered=ns.ordered,
         )
         if ns.magika:
             scan_kwargs["engine"] = "magika"
@@ -59,7 +61,27 @@ def cmd_detect(ns: argparse.Namespace) -> None:
             scan_kwargs["only"] = ns.only
 
 
-        if ns.ndjson:
+        if ns.incremental:
+            for change, path, res in scan_dir_incremental(
+                target, cache=not ns.no_cache, **scan_kwargs
+            ):
+                entry = {"path": str(path), "change": change, **res.model_dump()}
+                if ns.color:
+                    entry["path"] = _colorize_path(path)
+                if ns.trid and change != "removed":
+
+                    trid_res = _detect_file(path, engine="trid", cap_bytes=None, cache=not ns.no_cache)
+
+                    entry["trid"] = trid_res.model_dump()
+                if ns.ndjson:
+                    json.dump(entry, sys.stdout, indent=None if ns.raw else 2)
+                    sys.stdout.write("\n")
+                    sys.stdout.flush()
+                else:
+                    results.append(entry)
+            if not ns.ndjson:
+                json.dump(results, sys.stdout, indent=None if ns.raw else 2)
+        elif ns.ndjson:
             write = sys.stdout.write
             dump = lambda e: json.dump(e, sys.stdout, indent=None if ns.raw else 2)
             if ns.sync:
@@ -222,6 +244,23 @@ def _build_parser() -> argparse.ArgumentParser:
         default=0,
         help="Use a process pool with this many workers",
     )
+    p_det.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Files in flight at once during a directory scan (default: 4 per worker)",
+    )
+    p_det.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Emit directory results in walk order instead of completion order",
+    )
+    p_det.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-detect files changed since the last run and report added/changed/removed files",
+    )
 
     p_det.add_argument(
         "--ignore",
@@ -0,0 +1,404 @@
+"""Per-detection state shared by every engine that inspects one payload."""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import io
+import logging
+import mmap
+import os
+import string
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:  # optional dependency
+    import chardet  # type: ignore
+except Exception:  # pragma: no cover - fallback when chardet isn't installed
+    chardet = None
+
+from .libmagic import load_magic
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+_current: contextvars.ContextVar["DetectionContext | None"] = contextvars.ContextVar(
+    "probium_detection_context", default=None
+)
+
+
+# bytes inspected by the text/binary classification
+CLASSIFY_WINDOW = 8192
+
+# byte order marks of encodings whose text legitimately contains NUL bytes
+_WIDE_BOMS = (b"\xff\xfe", b"\xfe\xff", b"\x00\x00\xfe\xff")
+
+# bytes inspected when guessing the encoding of a text payload
+ENCODING_WINDOW = 4096
+
+# bytes decoded for the printable ratio of the head of the payload
+PRINTABLE_WINDOW = 512
+
+_BOM_ENCODINGS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+
+# str.translate table deleting every printable character
+_STRIP_PRINTABLE = {ord(c): None for c in string.printable}
+
+# files larger than this are memory-mapped instead of read into memory;
+# engines get this many leading bytes as ``payload``
+MAP_THRESHOLD = 1 << 20
+
+# bytes or a read-only mapping; both support ``find``/``rfind``, slicing to
+# bytes, ``len`` and the buffer protocol (``re``, ``hashlib``, memoryview)
+Data = Union[bytes, mmap.mmap]
+
+
+def map_file(path: str | Path, cap: int | None = None) -> mmap.mmap | None:
+    """Map at most ``cap`` bytes of ``path`` read-only.
+
+    Returns ``None`` for files no larger than :data:`MAP_THRESHOLD`, which
+    are cheaper to read, and when the file cannot be mapped.
+    """
+    try:
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if cap is not None:
+                size = min(size, cap)
+            if size <= MAP_THRESHOLD:
+                return None
+            # the mapping keeps its own handle, so the file can be closed
+            return mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+class _SourceReader(io.RawIOBase):
+    """Seekable read-only file over the whole source of a context.
+
+    Bytes inside :attr:`DetectionContext.data` are copied straight from its
+    view; anything past them is read from the file on demand, so archive
+    readers can seek to trailers the scan never loaded.
+    """
+
+    def __init__(self, ctx: "DetectionContext") -> None:
+        self._ctx = ctx
+        self._pos = 0
+        self._fh: io.BufferedReader | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        ctx = self._ctx
+        view = ctx.view
+        want = len(b)
+        n = 0
+        if self._pos < len(view):
+            chunk = view[self._pos : self._pos + want]
+            n = len(chunk)
+            b[:n] = chunk
+        if n < want and ctx.source is not None and self._pos + n < ctx.size:
+            if self._fh is None:
+                self._fh = open(ctx.source, "rb")
+            ctx.range_reads += 1
+            self._fh.seek(self._pos + n)
+            n += self._fh.readinto(memoryview(b)[n:]) or 0
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._ctx.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        super().close()
+
+
+def payload_digest(payload: Data) -> str:
+    """Return the digest used to key results for ``payload``."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def detect_encoding(payload: bytes) -> str:
+    """Guess the encoding of ``payload`` from its BOM or with chardet."""
+    for bom, encoding in _BOM_ENCODINGS:
+        if payload.startswith(bom):
+            return encoding
+    if chardet is not None:
+        try:
+            enc = chardet.detect(payload[:ENCODING_WINDOW]).get("encoding")
+            if enc:
+                return enc
+        except Exception:
+            pass
+    return "utf-8"
+
+
+class DetectionContext:
+    """A payload plus facts about it that are computed at most once.
+
+    :func:`probium.core._detect_file` builds one context per file and hands
+    it to every engine, so work such as hashing the payload is shared by the
+    whole engine chain instead of being repeated by each engine.
+
+    ``payload`` is always ``bytes``. For large files it only holds the first
+    :data:`MAP_THRESHOLD` bytes while :attr:`data` maps everything that was
+    scanned, so engines that need to look further search or slice
+    :attr:`data`, or open it with :meth:`reader`, instead of having the
+    whole file read into memory.
+
+    When the context knows the file it came from, :meth:`read`,
+    :meth:`head`, :meth:`tail` and :meth:`reader` also reach bytes beyond
+    the scanned region with small range reads, for formats identified by
+    a trailer. Such reads are counted in :attr:`range_reads` because the
+    result then depends on more than :attr:`digest` covers.
+    """
+
+    __slots__ = (
+        "payload",
+        "data",
+        "source",
+        "size",
+        "range_reads",
+        "_view",
+        "_ranges",
+        "_digest",
+        "_binary",
+        "_encoding",
+        "_decoded",
+        "_lines",
+        "_printable",
+        "_mime",
+    )
+
+    def __init__(
+        self,
+        payload: bytes,
+        *,
+        digest: str | None = None,
+        data: Data | None = None,
+        source: str | Path | None = None,
+        size: int | None = None,
+    ) -> None:
+        self.payload = payload
+        self.data: Data = payload if data is None else data
+        # file the payload was read from and its full size, for range reads
+        self.source = source
+        self.size = len(self.data) if size is None else max(size, len(self.data))
+        self.range_reads = 0
+        self._view: memoryview | None = None
+        self._ranges: dict[tuple[int, int], bytes] = {}
+        self._digest = digest
+        self._binary: bool | None = None
+        self._encoding: str | None = None
+        # (encoding, errors, limit) -> text, or None if decoding failed
+        self._decoded: dict[tuple[str, str, int | None], str | None] = {}
+        self._lines: list[str] | None = None
+        self._printable: float | None = None
+        self._mime: object = _UNSET
+
+    @classmethod
+    def of(cls, payload: bytes) -> "DetectionContext":
+        """Return the active context for ``payload`` or a new one."""
+        ctx = _current.get()
+        if ctx is not None and ctx.payload is payload:
+            return ctx
+        return cls(payload)
+
+    @contextmanager
+    def active(self) -> Iterator["DetectionContext"]:
+        """Make this context visible to :meth:`of` while engines run."""
+        if _current.get() is self:
+            yield self
+            return
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @property
+    def digest(self) -> str:
+        """Short blake2b digest of :attr:`data`, computed on first access."""
+        if self._digest is None:
+            self._digest = payload_digest(self.data)
+        return self._digest
+
+    @property
+    def cache_key(self) -> str:
+        """Key for results cached by content: :attr:`digest`, plus the size.
+
+        Engines may treat a payload differently when it is not the whole
+        source, so a truncated payload is keyed together with the source
+        size and never shares results with a complete one.
+        """
+        if self.complete:
+            return self.digest
+        return f"{self.digest}+{self.size}"
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy view of :attr:`data`; slices of it do not copy either."""
+        if self._view is None:
+            self._view = memoryview(self.data)
+        return self._view
+
+    def reader(self) -> io.RawIOBase:
+        """Return a new seekable file object over the whole source.
+
+        Reads inside :attr:`data` do not touch the disk; the rest is read
+        from :attr:`source`, if known.
+        """
+        return _SourceReader(self)
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Return up to ``length`` bytes of the source starting at ``offset``.
+
+        A negative ``offset`` counts from the end of the file. Ranges inside
+        :attr:`data` are sliced from it; others are read from :attr:`source`
+        once per context and shared by every engine asking for them.
+        """
+        if offset < 0:
+            offset = max(self.size + offset, 0)
+        end = min(offset + length, self.size)
+        if end <= len(self.data) or self.source is None:
+            return self.data[offset:end]
+        key = (offset, end)
+        try:
+            return self._ranges[key]
+        except KeyError:
+            pass
+        self.range_reads += 1
+        try:
+            with open(self.source, "rb") as fh:
+                fh.seek(offset)
+                chunk = fh.read(end - offset)
+        except OSError:
+            chunk = b""
+        self._ranges[key] = chunk
+        return chunk
+
+    def head(self, length: int) -> bytes:
+        """Return the first ``length`` bytes of the source."""
+        return self.read(0, length)
+
+    def tail(self, length: int) -> bytes:
+        """Return the last ``length`` bytes of the source."""
+        return self.read(-min(length, self.size), length)
+
+    @property
+    def complete(self) -> bool:
+        """Whether :attr:`data` holds the whole source."""
+        return len(self.data) >= self.size
+
+    @property
+    def is_binary(self) -> bool:
+        """Whether the head of the payload looks like binary data.
+
+        A NUL byte in the first :data:`CLASSIFY_WINDOW` bytes marks a payload
+        as binary unless it starts with a UTF-16/32 byte order mark.
+        """
+        if self._binary is None:
+            head = self.payload[:CLASSIFY_WINDOW]
+            self._binary = b"\x00" in head and not head.startswith(_WIDE_BOMS)
+        return self._binary
+
+    @property
+    def encoding(self) -> str:
+        """Encoding guessed from the BOM or the first :data:`ENCODING_WINDOW` bytes."""
+        if self._encoding is None:
+            self._encoding = detect_encoding(self.payload)
+        return self._encoding
+
+    def decode(
+        self,
+        encoding: str = "utf-8",
+        errors: str = "ignore",
+        limit: int | None = None,
+    ) -> str | None:
+        """Return the first ``limit`` bytes decoded, or ``None`` on failure.
+
+        Each combination of arguments is decoded once per context, so engines
+        asking for the same view of the payload share the string.
+        """
+        key = (encoding, errors, limit)
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        data = self.payload if limit is None else self.payload[:limit]
+        try:
+            text: str | None = data.decode(encoding, errors)
+        except (UnicodeError, LookupError):
+            text = None
+        self._decoded[key] = text
+        return text
+
+    @property
+    def text(self) -> str:
+        """The payload decoded as UTF-8 with undecodable bytes dropped."""
+        return self.decode("utf-8", "ignore") or ""
+
+    @property
+    def lines(self) -> list[str]:
+        """:attr:`text` split into lines; callers must not modify the list."""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    @property
+    def printable_ratio(self) -> float:
+        """Share of printable characters in the first :data:`PRINTABLE_WINDOW` bytes.
+
+        The window must be valid UTF-8; otherwise the ratio is ``0.0``.
+        """
+        if self._printable is None:
+            head = self.decode("utf-8", "strict", PRINTABLE_WINDOW)
+            if head is None:
+                self._printable = 0.0
+            else:
+                other = len(head.translate(_STRIP_PRINTABLE))
+                self._printable = (len(head) - other) / max(len(head), 1)
+        return self._printable
+
+    def magic_mime(self) -> str | None:
+        """MIME type libmagic reports for the payload, or ``None``.
+
+        libmagic is the most expensive check in the engine chain, so it runs
+        at most once per context and only when an engine asks for it.
+        ``None`` means python-magic is unavailable or libmagic failed.
+        """
+        if self._mime is _UNSET:
+            mime = None
+            magic = load_magic()
+            if magic is not None:
+                try:
+                    mime = magic.from_buffer(self.payload) or None
+                except Exception as exc:  # pragma: no cover - rare
+                    logger.warning("libmagic failed: %s", exc)
+            self._mime = mime
+        return self._mime  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        """Number of scanned bytes, including any beyond :attr:`payload`."""
+        return len(self.data)
@@ -1,21 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import collections
 import concurrent.futures as cf
-import functools
+import fnmatch
+import itertools
 import logging
+import multiprocessing.util
 import os
+import queue
+import re
+import stat
 from pathlib import Path
 from typing import Any, Iterable, Sequence
 
 # directories ignored by default when scanning
 DEFAULT_IGNORES = {".git", "venv", ".venv", "__pycache__"}
-from .cache import get as cache_get, put as cache_put
-from .registry import list_engines, get_instance
-from .magic_service import MAGIC_SIGNATURES, _MAX_SCAN
+from .cache import (
+    stat_sig,
+    get as cache_get,
+    put as cache_put,
+    get_content as cache_get_content,
+    put_content as cache_put_content,
+    flush as cache_flush,
+)
+from .registry import list_engines, get_instance, fingerprint, all_engines
+from .context import MAP_THRESHOLD, DetectionContext, map_file
+from .magic_service import MAGIC_INDEX
+from .libmagic import load_magic
+from .signatures import SignatureIndex
+from .exceptions import UnsupportedType
 from .scoring import score_magic
 
-from .models import Result, Candidate
+from .models import Result, Candidate, RawCandidate, RawResult
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +47,6 @@ def _load_bytes(source: str | Path | bytes, cap: int | None) -> bytes:
         if not p.exists():
             # logger.warning(f"Source file does not exist: {p}")
             return b""
-        cached = cache_get(p)
-        if isinstance(cached, (bytes, bytearray)):
-            return cached[:cap] if cap else bytes(cached)
         try:
             with p.open("rb") as fh:
                 if cap is None:
@@ -46,6 +60,86 @@ def _load_bytes(source: str | Path | bytes, cap: int | None) -> bytes:
     return source[:cap] if (cap is not None) else source
 
 
+def _load_context(
+    source: str | Path | bytes, cap: int | None, size: int | None = None
+) -> DetectionContext:
+    """Return a :class:`DetectionContext` over the first ``cap`` bytes of ``source``.
+
+    Files larger than :data:`~probium.context.MAP_THRESHOLD` are mapped
+    rather than read, so a multi-gigabyte archive costs address space
+    instead of resident memory; only the head that every engine sees as
+    ``payload`` is copied. For paths, ``size`` is the file size engines may
+    range-read up to beyond the cap.
+    """
+    if cap is not None and cap < 0:
+        cap = None
+    if not isinstance(source, (str, Path)):
+        return DetectionContext(_load_bytes(source, cap))
+    if cap is None or cap > MAP_THRESHOLD:
+        data = map_file(source, cap)
+        if data is not None:
+            return DetectionContext(
+                data[:MAP_THRESHOLD], data=data, source=source, size=size
+            )
+    return DetectionContext(_load_bytes(source, cap), source=source, size=size)
+
+
+def _cache_tag(
+    engine: str,
+    only: Iterable[str] | None,
+    engine_order: Iterable[str] | None,
+) -> str:
+    """Return a key describing the engine chain a cached result came from."""
+    parts = [engine, fingerprint()]
+    parts.append(",".join(only) if only is not None else "*")
+    parts.append(",".join(engine_order) if engine_order is not None else "*")
+    return "|".join(parts)
+
+
+# (registry fingerprint, index over every engine's declared ``magic``)
+_prefilter: tuple[str, SignatureIndex[str]] | None = None
+
+
+def _prefilter_index() -> SignatureIndex[str]:
+    """Return the index of engine-declared signatures, rebuilt on registration."""
+    global _prefilter
+    fp = fingerprint()
+    current = _prefilter
+    if current is not None and current[0] == fp:
+        return current[1]
+    index: SignatureIndex[str] = SignatureIndex(
+        (sig, offset, name)
+        for name, cls in all_engines().items()
+        for sig, offset in getattr(cls, "magic", ())
+    )
+    _prefilter = (fp, index)
+    return index
+
+
+def _select_engines(engines: Sequence[str], ctx: DetectionContext) -> list[str]:
+    """Return the engines in ``engines`` whose prefilter admits ``ctx``.
+
+    Engines that declare ``magic`` only run when one of their signatures is
+    present, ``kind`` restricts them to text or binary payloads and payloads
+    shorter than ``min_length`` are skipped outright.
+    """
+    hits = {name for _, _, name in _prefilter_index().match(ctx.payload)}
+    size = len(ctx)
+    selected = []
+    for name in engines:
+        eng = get_instance(name)
+        if size < eng.min_length:
+            continue
+        if eng.magic and name not in hits:
+            continue
+        if eng.kind == "text" and ctx.is_binary:
+            continue
+        if eng.kind == "binary" and not ctx.is_binary:
+            continue
+        selected.append(name)
+    return selected
+
+
 def _detect_file(
     source: str | Path | bytes,
     engine: str = "auto",
@@ -98,61 +192,80 @@ def _detect_file(
             )
 
     p: Path | None = None
+    st: os.stat_result | None = None
     if isinstance(source, (str, Path)):
         p = Path(source)
-        if not p.exists():
+        try:
+            st = os.stat(p)
+        except OSError:
             return Result(
                 candidates=[
                     Candidate(media_type="application/x-missing", confidence=0.0)
                 ],
                 error=f"File or Directory does not exist: {p}",
             )
-        if p.is_dir():
+        if stat.S_ISDIR(st.st_mode):
             return Result(
                 candidates=[Candidate(media_type="inode/directory", confidence=1.0)]
             )
 
-    ext = Path(source).suffix.lower().lstrip(".")
-    if ext in {
-        "docx",
-        "docm",
-        "pptx",
-        "pptm",
-        "xlsx",
-        "xlsm",
-        "xltx",
-        "odt",
-        "odp",
-        "ods",
-        "zip",
-        "jar",
-        "doc",
-        "ppt",
-        "xls",
-    }:
-        cap_bytes = 10000000
-
     scan_cap = cap_bytes
     if engine == "auto" and only is None:
-        scan_cap = max(cap_bytes or 0, _MAX_SCAN)
+        scan_cap = max(cap_bytes or 0, MAGIC_INDEX.max_end + 1)
 
     if no_cap:
-        payload = _load_bytes(source, None)
-    else:
-        payload = _load_bytes(source, scan_cap)
+        scan_cap = None
+
+    if only is not None:
+        only = list(only)
+    if engine_order is not None:
+        engine_order = list(engine_order)
+
+    tag = path_tag = ""
+    use_cache = cache and p is not None
+    if cache:
+        tag = _cache_tag(engine, only, engine_order)
+        path_tag = f"{tag}|{scan_cap}"
+    if use_cache:
+        cached = cache_get(p, tag=path_tag, st=st)
+        if cached is not None:
+            return cached
+
+    # shared by every engine below so the payload is hashed once per file
+    size = st.st_size if st is not None else None
+    ctx = _load_context(source, scan_cap, size)
+    payload = ctx.payload
+
+    # identical content under another name (or from another process) shares
+    # one result keyed by the digest of the scanned bytes
+    digest: str | None = None
+    if cache:
+        digest = ctx.cache_key
+        cached = cache_get_content(digest, tag=tag)
+        if cached is not None:
+            if use_cache:
+                cache_put(p, cached, tag=path_tag, st=st)
+            return cached
+
+    def _remember(raw: RawResult, *, content: bool = True) -> Result:
+        # the one place engine output becomes a validated pydantic Result
+        res = raw.to_model()
+        if use_cache:
+            cache_put(p, res, tag=path_tag, st=st)
+        # results that range-read past the scanned bytes are not keyed by
+        # their digest alone
+        if digest is not None and content and not ctx.range_reads:
+            cache_put_content(digest, res, tag=tag)
+        return res
 
     if engine != "auto":
-        return get_instance(engine)(payload)
+        return _remember(get_instance(engine)(ctx))
 
     if only is not None:
-        only_list = list(only)
-        if len(only_list) == 1:
-            res = get_instance(only_list[0])(payload)
-            if cache and isinstance(source, (str, Path)):
-                cache_put(Path(source), res)
-            return res
+        if len(only) == 1:
+            return _remember(get_instance(only[0])(ctx))
 
-    magic_best: Result | None = None
+    magic_best: RawResult | None = None
 
     if only is not None:
         if engine_order is not None:
@@ -162,22 +275,28 @@ def _detect_file(
             engines = list(only)
     else:
         engines = engine_order or list_engines()
-        for sig, off, en in MAGIC_SIGNATURES:
-            end = off + len(sig)
-            if len(payload) >= end and payload[off:end] == sig:
-                res = get_instance(en)(payload)
-                if res.candidates:
-                    res.candidates[0].breakdown = {"magic_len": float(len(sig))}
-                    # res.candidates[0].confidence = score_magic(len(sig))
-                    magic_best = res
-                    if res.candidates[0].confidence >= 0.9:
-                        return res
+        # every signature hit, longest first; the first engine that
+        # recognises the payload wins the magic fast path
+        for sig, _, en in MAGIC_INDEX.match(payload):
+            try:
+                res = get_instance(en)(ctx)
+            except UnsupportedType:
+                continue
+            if res.candidates:
+                res.candidates[0] = res.candidates[0]._replace(
+                    breakdown={"magic_len": float(len(sig))}
+                )
+                # res.candidates[0].confidence = score_magic(len(sig))
+                magic_best = res
+                if res.candidates[0].confidence >= 0.9:
+                    return _remember(res)
                 break
 
-    best: Result | None = magic_best
+    best: RawResult | None = magic_best
+    full_read = False
 
-    for name in engines:
-        res = get_instance(name)(payload)
+    for name in _select_engines(engines, ctx):
+        res = get_instance(name)(ctx)
         if res.candidates:
             if (
                 best is None
@@ -191,22 +310,21 @@ def _detect_file(
         and cap_bytes is not None
         and isinstance(source, (str, Path))
     ):
-        payload = Path(source).read_bytes()
-        for name in engines:
-            res = get_instance(name)(payload)
+        ctx = _load_context(source, None, size)
+        full_read = True
+        for name in _select_engines(engines, ctx):
+            res = get_instance(name)(ctx)
             if res.candidates:
                 best = res
                 break
 
     if best is None:
-        best = Result(
-            candidates=[
-                Candidate(media_type="application/octet-stream", confidence=0.0)
-            ]
+        best = RawResult(
+            [RawCandidate(media_type="application/octet-stream", confidence=0.0)]
         )
-    if cache and isinstance(source, (str, Path)):
-        cache_put(Path(source), best)
-    return best
+    # a result that needed the whole file is not a function of the scanned
+    # prefix, so only the stat-validated path cache may keep it
+    return _remember(best, content=not full_read)
 
 
 def detect(
@@ -255,6 +373,268 @@ except ImportError:  # pragma: no cover - optional dependency
         return await asyncio.to_thread(_detect_file, source, **kw)
 
 
+# paths pulled from the directory walker per hop to a worker thread
+_WALK_BATCH = 256
+
+# default in-flight window of the directory scanners, per worker
+_PENDING_PER_WORKER = 4
+
+
+def _pending_window(max_pending: int | None, pool_size: int) -> int:
+    """Return the number of files a scan may have in flight at once."""
+    if max_pending is None:
+        return max(pool_size, 1) * _PENDING_PER_WORKER
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+    return max_pending
+
+
+def _compile_pattern(pattern: str) -> tuple[re.Pattern[str] | None, ...]:
+    """Split a glob ``pattern`` into per-component matchers.
+
+    ``None`` stands for ``**`` (any number of directories); every other
+    component is matched case-sensitively like :meth:`pathlib.Path.glob`.
+    """
+    parts = [part for part in pattern.replace(os.sep, "/").split("/") if part]
+    return tuple(
+        None if part == "**" else re.compile(fnmatch.translate(part)) for part in parts
+    )
+
+
+def _match_parts(
+    pats: tuple[re.Pattern[str] | None, ...], parts: tuple[str, ...], is_dir: bool
+) -> bool:
+    """Return whether the relative path ``parts`` matches ``pats``."""
+    if not pats:
+        return not parts
+    head = pats[0]
+    if head is None:
+        if len(pats) == 1:
+            # a trailing ``**`` matches directories only
+            return is_dir
+        return any(
+            _match_parts(pats[1:], parts[i:], is_dir) for i in range(len(parts) + 1)
+        )
+    if not parts or not head.match(parts[0]):
+        return False
+    return _match_parts(pats[1:], parts[1:], is_dir)
+
+
+def _walk(
+    root: Path,
+    pattern: str,
+    ignore: set[str],
+    allowed: set[str] | None = None,
+    sort: bool = False,
+) -> Iterable[Path]:
+    """Lazily yield paths under ``root`` matching ``pattern``.
+
+    Directories named in ``ignore`` are pruned before descending into them,
+    file types come from the ``DirEntry`` so no extra ``stat`` is needed to
+    tell files from directories, and symlinked directories are reported but
+    not followed. With ``allowed``, files with a suffix outside that set of
+    extensions are skipped. Matching directories are yielded as well, like
+    ``root.glob(pattern)``. With ``sort``, each directory is listed in name
+    order so the walk is the same on every run and filesystem.
+    """
+    pats = _compile_pattern(pattern)
+    # a pattern without ``**`` never matches deeper than its length
+    max_depth = len(pats) if None not in pats else None
+    stack: list[tuple[str, tuple[str, ...]]] = [(os.fspath(root), ())]
+    while stack:
+        path, rel = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            entries = sorted(it, key=lambda e: e.name) if sort else it
+            for entry in entries:
+                name = entry.name
+                if name in ignore:
+                    continue
+                parts = rel + (name,)
+                try:
+                    is_dir = entry.is_dir()
+                    descend = is_dir and not entry.is_symlink()
+                except OSError:
+                    is_dir = descend = False
+                if _match_parts(pats, parts, is_dir):
+                    if is_dir or allowed is None:
+                        yield Path(entry.path)
+                    else:
+                        suffix = Path(name).suffix.lower().lstrip(".")
+                        if not suffix or suffix in allowed:
+                            yield Path(entry.path)
+                if descend and (max_depth is None or len(parts) < max_depth):
+                    subdirs.append((entry.path, parts))
+        # depth-first, visiting subdirectories in the order they were listed
+        stack.extend(reversed(subdirs))
+
+
+# files sent to a worker process per task
+CHUNK_SIZE = 64
+
+
+def _init_worker() -> None:
+    """Process-pool initializer: load every engine and libmagic up front.
+
+    Pool workers end with ``os._exit``, which skips ``atexit`` hooks, so the
+    write-behind cache is flushed by a multiprocessing finalizer instead;
+    until then rows are batched across every chunk the worker handles.
+    """
+    for name in list_engines():
+        get_instance(name)
+    load_magic()
+    _prefilter_index()
+    multiprocessing.util.Finalize(None, cache_flush, exitpriority=10)
+
+
+def _detect_chunk(paths: Sequence[Path], kw: dict[str, Any]) -> list[RawResult]:
+    """Detect ``paths`` in a worker process.
+
+    Results travel back as :class:`RawResult` objects, which pickle to a
+    fraction of the size of the pydantic models.
+    """
+    return [RawResult.from_model(_detect_file(p, **kw)) for p in paths]
+
+
+def _scan_processes(
+    paths: Iterable[Path],
+    processes: int,
+    window: int,
+    chunk_size: int,
+    ordered: bool,
+    kw: dict[str, Any],
+):
+    """Yield ``(path, Result)`` for ``paths`` using a chunked process pool."""
+    done: queue.SimpleQueue[tuple[list[Path], cf.Future]] = queue.SimpleQueue()
+    # ordered mode: chunks in submission order, drained from the head only
+    order: collections.deque[tuple[list[Path], cf.Future]] = collections.deque()
+    pending = 0
+
+    def _take(item: tuple[list[Path], cf.Future]):
+        chunk, fut = item
+        for path, raw in zip(chunk, fut.result()):
+            yield path, raw.to_model()
+
+    def _next(block: bool) -> tuple[list[Path], cf.Future] | None:
+        if ordered:
+            if order and (block or order[0][1].done()):
+                return order.popleft()
+            return None
+        if block:
+            return done.get()
+        try:
+            return done.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _submit(chunk: list[Path]) -> None:
+        fut = ex.submit(_detect_chunk, chunk, kw)
+        if ordered:
+            order.append((chunk, fut))
+        else:
+            fut.add_done_callback(lambda f, c=chunk: done.put((c, f)))
+
+    with cf.ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as ex:
+        chunk: list[Path] = []
+        for p in paths:
+            chunk.append(p)
+            if len(chunk) < chunk_size:
+                continue
+            while pending >= window:
+                item = _next(True)
+                pending -= len(item[0])
+                yield from _take(item)
+            _submit(chunk)
+            pending += len(chunk)
+            chunk = []
+            while (item := _next(False)) is not None:
+                pending -= len(item[0])
+                yield from _take(item)
+        if chunk:
+            _submit(chunk)
+            pending += len(chunk)
+
+        while pending:
+            item = _next(True)
+            pending -= len(item[0])
+            yield from _take(item)
+
+
+def _scan_threads(
+    paths: Iterable[Path],
+    workers: int,
+    window: int,
+    ordered: bool,
+    kw: dict[str, Any],
+):
+    """Yield ``(path, Result)`` for ``paths`` using a thread pool."""
+    # finished futures are handed over as they complete so results stream
+    # out while the walk is still in progress; in ordered mode they wait in
+    # submission order instead and only the head is ever yielded
+    done: queue.SimpleQueue[tuple[Path, cf.Future]] = queue.SimpleQueue()
+    order: collections.deque[tuple[Path, cf.Future]] = collections.deque()
+
+    def _next(block: bool) -> tuple[Path, cf.Future] | None:
+        if ordered:
+            if order and (block or order[0][1].done()):
+                return order.popleft()
+            return None
+        if block:
+            return done.get()
+        try:
+            return done.get_nowait()
+        except queue.Empty:
+            return None
+
+    with cf.ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = 0
+        for p in paths:
+            while pending >= window:
+                # backpressure: wait for the caller to take a result
+                path, fut = _next(True)
+                pending -= 1
+                yield path, fut.result()
+            fut = ex.submit(_detect_file, p, **kw)
+            if ordered:
+                order.append((p, fut))
+            else:
+                fut.add_done_callback(lambda f, p=p: done.put((p, f)))
+            pending += 1
+            while (item := _next(False)) is not None:
+                path, fut = item
+                pending -= 1
+                yield path, fut.result()
+
+        while pending:
+            path, fut = _next(True)
+            pending -= 1
+            yield path, fut.result()
+
+
+def _scan_paths(
+    paths: Iterable[Path],
+    workers: int,
+    processes: int,
+    max_pending: int | None,
+    chunk_size: int,
+    ordered: bool,
+    kw: dict[str, Any],
+):
+    """Detect ``paths`` on the pool :func:`scan_dir` was configured with."""
+    if processes > 0:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        window = _pending_window(max_pending, processes * chunk_size)
+        yield from _scan_processes(paths, processes, window, chunk_size, ordered, kw)
+    else:
+        window = _pending_window(max_pending, workers)
+        yield from _scan_threads(paths, workers, window, ordered, kw)
+
+
 def scan_dir(
     root: str | Path,
     *,
@@ -264,6 +644,9 @@ def scan_dir(
     only: Iterable[str] | None = None,
     extensions: Iterable[str] | None = None,
     ignore: Iterable[str] | None = None,
+    max_pending: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    ordered: bool = False,
     **kw,
 ):
     """Yield ``(path, Result)`` tuples for files under ``root``.
@@ -287,6 +670,24 @@ def scan_dir(
         Optional iterable of directory names to skip during scanning. If not
         provided, a default set of common build and VCS directories is ignored.
 
+    max_pending:
+        Upper bound on files submitted but not yet yielded. The directory
+        walk pauses once the window is full until the caller consumes a
+        result, keeping memory flat on very large trees. Defaults to
+        ``4 * workers``, or four chunks per process with ``processes``.
+
+    chunk_size:
+        With ``processes``, the number of files sent to a worker process per
+        task. Workers load every engine and libmagic once at start-up and
+        return compact results, so batching keeps IPC cheap for small files.
+
+    ordered:
+        Yield results in walk order instead of completion order. Finished
+        results wait in a reorder buffer bounded by ``max_pending`` until
+        every earlier path has been yielded, so output is deterministic for
+        a given tree without sorting it afterwards; each directory is listed
+        in name order for the same reason. A slow file holds back the results
+        behind it, which costs some throughput.
 
     kw:
         Additional arguments passed to :func:`detect`.
@@ -311,31 +712,104 @@ def scan_dir(
     ignore_set = set(DEFAULT_IGNORES)
     if ignore:
         ignore_set.update(Path(d).name for d in ignore)
-    paths = []
-    for p in root.glob(pattern):
-        if ignore_set and any(part in ignore_set for part in p.relative_to(root).parts):
-            continue
-        paths.append(p)
+    allowed = None
     if extensions is not None:
         allowed = {e.lower().lstrip(".") for e in extensions}
-        paths = [
-            p
-            for p in paths
-            if p.is_dir() or not p.suffix or p.suffix.lower().lstrip(".") in allowed
-        ]
-
-    Executor = cf.ProcessPoolExecutor if processes > 0 else cf.ThreadPoolExecutor
-    pool_size = processes if processes > 0 else workers
-    with Executor(max_workers=pool_size) as ex:
-        futs = {
-            ex.submit(_detect_file, p, only=only, extensions=extensions, **kw): p
-            for p in paths
-        }
-
-        for fut in cf.as_completed(futs):
-            yield futs[fut], fut.result()
-
 
+    paths = _walk(root, pattern, ignore_set, allowed, ordered)
+    kw.update(only=only, extensions=extensions)
+    yield from _scan_paths(
+        paths, workers, processes, max_pending, chunk_size, ordered, kw
+    )
+
+
+def scan_dir_incremental(
+    root: str | Path,
+    *,
+    pattern: str = "**/*",
+    workers: int = os.cpu_count() or 4,
+    processes: int = 0,
+    only: Iterable[str] | None = None,
+    extensions: Iterable[str] | None = None,
+    ignore: Iterable[str] | None = None,
+    max_pending: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    ordered: bool = False,
+    manifest_db: str | Path | None = None,
+    **kw,
+):
+    """Yield ``(change, path, Result)`` for files that changed since last run.
+
+    Each file's ``(mtime, size, inode, device)`` and result are kept in a
+    manifest next to the result cache. Files whose stat still matches the
+    manifest are skipped without being read; the rest are detected exactly
+    as :func:`scan_dir` would and reported with ``change`` set to
+    ``"added"`` or ``"changed"``. Once the walk completes, files recorded by
+    a previous run but no longer found are reported as ``"removed"`` along
+    with their last result. Only regular files are tracked.
+
+    The manifest is keyed by ``root`` and every option that affects results,
+    so the first run with new options reports all files as added. The other
+    parameters are the same as for :func:`scan_dir`; ``manifest_db``
+    overrides the database location.
+    """
+    from .manifest import Manifest
+
+    root = Path(root)
+    if not root.is_dir():
+        raise NotADirectoryError(f"Path does not exist or is not a directory: {root}")
+
+    ignore_set = set(DEFAULT_IGNORES)
+    if ignore:
+        ignore_set.update(Path(d).name for d in ignore)
+    allowed = None
+    if extensions is not None:
+        allowed = {e.lower().lstrip(".") for e in extensions}
+
+    scope = "|".join(
+        [
+            os.path.abspath(root),
+            pattern,
+            _cache_tag(kw.get("engine", "auto"), only, kw.get("engine_order")),
+            ",".join(sorted(allowed)) if allowed is not None else "*",
+            ",".join(sorted(ignore_set)),
+            str(kw.get("cap_bytes", 4096)),
+            str(kw.get("no_cap", False)),
+        ]
+    )
+    manifest = Manifest(scope, manifest_db)
+    # path -> (change, stat before detection); bounded by the scan window
+    jobs: dict[Path, tuple[str, os.stat_result]] = {}
+
+    def _stale():
+        for p in _walk(root, pattern, ignore_set, allowed, ordered):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            seen = manifest.lookup(p)
+            if seen == stat_sig(st):
+                manifest.touch(p)
+                continue
+            jobs[p] = ("added" if seen is None else "changed", st)
+            yield p
+
+    kw.update(only=only, extensions=extensions)
+    try:
+        for path, res in _scan_paths(
+            _stale(), workers, processes, max_pending, chunk_size, ordered, kw
+        ):
+            change, st = jobs.pop(path)
+            manifest.record(path, st, res)
+            yield change, path, res
+        for path, res in manifest.removed():
+            yield "removed", path, res
+    finally:
+        manifest.close()
+
+
 async def scan_dir_async(
     root: str | Path,
     *,
@@ -345,59 +819,130 @@ async def scan_dir_async(
     only: Iterable[str] | None = None,
     extensions: Iterable[str] | None = None,
     ignore: Iterable[str] | None = None,
+    max_pending: int | None = None,
+    ordered: bool = False,
     **kw,
 ) -> Iterable[tuple[Path, Result]]:
     """Asynchronously yield ``(path, Result)`` for files and dirs under ``root``.
 
-    Parameters are the same as :func:`scan_dir` but detection runs concurrently
-    using ``asyncio`` tasks.
+    Parameters are the same as :func:`scan_dir` (except ``chunk_size``).
+    A fixed pool of ``workers`` (or ``processes``) consumer tasks pulls paths
+    from a queue fed by the directory walker, so the number of tasks does
+    not grow with the tree; at most ``max_pending`` files are in flight
+    between the walker and the caller. With ``ordered``, results that finish
+    early wait in that same window until they are next in walk order.
     """
 
-    root = Path(root)
+    root = Path(root)
     ignore_set = set(DEFAULT_IGNORES)
     if ignore:
         ignore_set.update(Path(d).name for d in ignore)
     allowed = None
     if extensions is not None:
         allowed = {e.lower().lstrip(".") for e in extensions}
-
-    paths = []
-    for p in root.glob(pattern):
-        if ignore_set and any(part in ignore_set for part in p.relative_to(root).parts):
-            continue
-        if allowed is not None and p.is_file():
-            if p.suffix and p.suffix.lower().lstrip(".") not in allowed:
-                continue
-        paths.append(p)
 
     use_proc = processes > 0
-    sem = asyncio.Semaphore(processes if use_proc else workers)
+    consumers = max(processes if use_proc else workers, 1)
+    window = _pending_window(max_pending, consumers)
     executor: cf.Executor | None = None
     if use_proc:
-        executor = cf.ProcessPoolExecutor(max_workers=processes)
-
-    async def _run(path: Path):
-        async with sem:
-            if executor is not None:
-                loop = asyncio.get_running_loop()
-                res = await loop.run_in_executor(
-                    executor,
-                    functools.partial(
-                        _detect_file,
-                        path,
-                        engine="auto",
-                        cap_bytes=None,
-                        only=only,
-                        extensions=extensions,
-                        **kw,
-                    ),
+        executor = cf.ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker
+        )
+
+    # worker defaults apply only where the caller left an option unset
+    worker_kw = {
+        "engine": "auto",
+        "cap_bytes": None,
+        **kw,
+        "only": only,
+        "extensions": extensions,
+    }
+
+    async def _run(path: Path) -> Result:
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            (raw,) = await loop.run_in_executor(
+                executor, _detect_chunk, [path], worker_kw
+            )
+            return raw.to_model()
+        return await detect_async(path, only=only, extensions=extensions, **kw)
+
+    # producer -> paths -> consumers -> results -> caller; ``slots`` is taken
+    # by the producer per path and given back once the caller has the result.
+    # Paths carry their walk position so ordered mode can restore the order.
+    paths: asyncio.Queue[tuple[int, Path] | None] = asyncio.Queue()
+    results: asyncio.Queue[
+        tuple[int, Path, Result] | Exception | None
+    ] = asyncio.Queue()
+    slots = asyncio.Semaphore(window)
+
+    async def _produce() -> None:
+        # the walk runs in a worker thread a batch at a time so the event
+        # loop keeps serving consumers while directories are listed
+        walker = iter(_walk(root, pattern, ignore_set, allowed, ordered))
+        seq = itertools.count()
+        try:
+            while True:
+                batch = await asyncio.to_thread(
+                    list, itertools.islice(walker, _WALK_BATCH)
                 )
-            else:
-                res = await detect_async(path, only=only, extensions=extensions, **kw)
-            return path, res
-
-    tasks = [asyncio.create_task(_run(p)) for p in paths]
-    for coro in asyncio.as_completed(tasks):
-        yield await coro
-    if executor is not None:
-        executor.shutdown()
+                for p in batch:
+                    await slots.acquire()
+                    paths.put_nowait((next(seq), p))
+                if len(batch) < _WALK_BATCH:
+                    break
+        except Exception as exc:
+            results.put_nowait(exc)
+        for _ in range(consumers):
+            paths.put_nowait(None)
+
+    async def _consume() -> None:
+        while True:
+            job = await paths.get()
+            if job is None:
+                results.put_nowait(None)
+                return
+            idx, path = job
+            try:
+                item: tuple[int, Path, Result] | Exception = (
+                    idx,
+                    path,
+                    await _run(path),
+                )
+            except Exception as exc:
+                item = exc
+            results.put_nowait(item)
+
+    tasks = [asyncio.create_task(_produce())]
+    tasks += [asyncio.create_task(_consume()) for _ in range(consumers)]
+    # ordered mode: finished results keyed by walk position, at most
+    # ``window`` of them since their slots are still taken
+    early: dict[int, tuple[Path, Result]] = {}
+    head = 0
+    try:
+        running = consumers
+        while running:
+            item = await results.get()
+            if item is None:
+                running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            idx, path, res = item
+            if not ordered:
+                slots.release()
+                yield path, res
+                continue
+            early[idx] = path, res
+            while head in early:
+                ready = early.pop(head)
+                head += 1
+                slots.release()
+                yield ready
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if executor is not None:
+            executor.shutdown()
@@ -1,7 +1,8 @@
 from __future__ import annotations
-import abc, time, logging, hashlib, threading
+import abc, time, logging, threading
 from cachetools import LRUCache
-from ..models import Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult, Result
 from ..exceptions import EngineFailure
 
 logger = logging.getLogger(__name__)
@@ -10,38 +11,76 @@ class EngineBase(abc.ABC):
     cost: float = 1.0
     cache_size: int = 256
 
+    # Prefilter metadata the dispatcher checks before calling the engine:
+    # ``magic`` lists (signature, offset) pairs one of which must be present,
+    # ``kind`` is "text", "binary" or "any" and ``min_length`` is the
+    # shortest payload the engine can recognise.
+    magic: tuple[tuple[bytes, int], ...] = ()
+    kind: str = "any"
+    min_length: int = 0
+
     def __init__(self) -> None:
-        self._cache: LRUCache[str, Result] = LRUCache(maxsize=self.cache_size)
+        # cache key -> (candidates, error); candidates are immutable so a hit
+        # can share them with every result built from the entry
+        self._cache: LRUCache[str, tuple[tuple[RawCandidate, ...], str | None]] = (
+            LRUCache(maxsize=self.cache_size)
+        )
         self._lock = threading.RLock()
 
-    def __call__(self, payload: bytes) -> Result:
-        """Run :meth:`sniff` with caching and timing instrumentation."""
+    def __call__(self, payload: bytes | DetectionContext) -> RawResult:
+        """Run :meth:`sniff` with caching and timing instrumentation.
+
+        ``payload`` may be raw bytes or a :class:`DetectionContext` shared
+        with the other engines inspecting the same file, in which case the
+        payload digest is computed once for the whole chain. The returned
+        :class:`~probium.models.RawResult` converts with ``to_model()``.
+        """
 
         t0 = time.perf_counter()
-        digest = hashlib.md5(payload).hexdigest()
+        if isinstance(payload, DetectionContext):
+            ctx = payload
+        else:
+            ctx = DetectionContext.of(payload)
+        payload = ctx.payload
+        digest = ctx.digest
+        key = ctx.cache_key
         with self._lock:
-            cached = self._cache.get(digest)
+            cached = self._cache.get(key)
         if cached is not None:
-            cached = cached.model_copy(deep=True)
-            cached.engine = self.name
-            cached.elapsed_ms = (time.perf_counter() - t0) * 1000
-            cached.bytes_analyzed = len(payload)
-            cached.hash = digest
-            return cached
+            candidates, error = cached
+            # thin wrapper: fresh per-call metadata around shared candidates
+            return RawResult(
+                list(candidates),
+                error,
+                engine=self.name,
+                bytes_analyzed=len(ctx),
+                elapsed_ms=(time.perf_counter() - t0) * 1000,
+                hash=digest,
+            )
+        range_reads = ctx.range_reads
         try:
-            res = self.sniff(payload)
+            with ctx.active():
+                res = self.sniff(payload)
         except Exception as exc:
             logger.exception("%s failed", self.name)
             raise EngineFailure(str(exc)) from exc
+        if isinstance(res, Result):
+            # third-party engines may still build pydantic results
+            res = RawResult.from_model(res)
         res.engine = self.name
         res.elapsed_ms = (time.perf_counter() - t0) * 1000
-        res.bytes_analyzed = len(payload)
+        res.bytes_analyzed = len(ctx)
         res.hash = digest
-        with self._lock:
-            self._cache[digest] = res
+        if ctx.range_reads == range_reads:
+            # a sniff that read past the scanned bytes is not keyed by digest
+            with self._lock:
+                self._cache[key] = (tuple(res.candidates), res.error)
         return res
     @abc.abstractmethod
-    def sniff(self, payload: bytes) -> Result:
-        """Examine ``payload`` and return a :class:`~probium.models.Result`."""
+    def sniff(self, payload: bytes) -> RawResult | Result:
+        """Examine ``payload`` and return a :class:`~probium.models.RawResult`.
+
+        A pydantic :class:`~probium.models.Result` is accepted as well.
+        """
 
         ...
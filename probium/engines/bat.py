@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -9,17 +9,18 @@ from ..registry import register
 class BATEngine(EngineBase):
     name = "bat"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         first_line = payload.splitlines()[:1]
         if first_line:
             line = first_line[0].lower()
             if line.startswith((b"@echo", b"echo", b"rem", b"::")):
-                cand = Candidate(
+                cand = RawCandidate(
                     media_type="application/x-bat",
                     extension="bat",
                     confidence=score_tokens(1.0),
                     breakdown={"token_ratio": 1.0},
                 )
-                return Result(candidates=[cand])
-        return Result(candidates=[])
+                return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
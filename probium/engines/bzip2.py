@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _BZ_MAGIC = b"BZh"
 class Bzip2Engine(EngineBase):
     name = "bzip2"
     cost = 0.1
+    magic = ((_BZ_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_BZ_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/x-bzip",
                 extension="bz2",
                 confidence=score_magic(len(_BZ_MAGIC)),
                 breakdown={"magic_len": float(len(_BZ_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -4,33 +4,29 @@ import io
 import logging
 import mimetypes
 import re
-import hashlib
-from functools import lru_cache
+from collections import Counter
 from typing import Optional
 
-try:  # optional dependency
-    import chardet  # type: ignore
-except Exception:  # pragma: no cover - fallback when chardet isn't installed
-    chardet = None
-
+from ..context import DetectionContext, detect_encoding
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
-from ..libmagic import load_magic
 
 logger = logging.getLogger(__name__)
-_magic = load_magic()
 
 @register
 class CSVEngine(EngineBase):
     name = "csv"
     cost = 0.05
+    kind = "text"
 
     # Configurable constants
     DELIMS = ",;\t|"
     MIN_ROWS = 3
     SAMPLE_LINES = 20
+    AGREE_ROWS = 5  # rows that settle the delimiter when they all agree
+    AGREE_RATIO = 0.9  # share of rows that must agree otherwise
     SAMPLE_SIZE = 4096  # bytes for initial analysis
     CHUNK_SIZE = 8192  # bytes for streaming
     TOKEN_RATIO_THRESHOLD = 0.01
@@ -43,6 +39,7 @@ class CSVEngine(EngineBase):
     HEADER_BOOST = 0.1
 
     _TOKEN_RE = re.compile(r"[,\t;|]")
+    _CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
     BOM_UTF8 = b'\xef\xbb\xbf'
     BOM_UTF16_LE = b'\xff\xfe'
     BOM_UTF16_BE = b'\xfe\xff'
@@ -50,68 +47,118 @@ class CSVEngine(EngineBase):
 
     def detect_encoding(self, payload: bytes) -> str:
         """Detect the encoding of the payload using BOMs or chardet."""
-        if payload.startswith(self.BOM_UTF8):
-            logger.debug("Detected UTF-8 BOM")
-            return 'utf-8-sig'
-        elif payload.startswith(self.BOM_UTF16_LE):
-            logger.debug("Detected UTF-16 LE BOM")
-            return 'utf-16-le'
-        elif payload.startswith(self.BOM_UTF16_BE):
-            logger.debug("Detected UTF-16 BE BOM")
-            return 'utf-16-be'
-        else:
-            if chardet is not None:
+        return detect_encoding(payload)
+
+    def _split_rows(self, sample: str) -> tuple[Optional[str], list[list[str]]]:
+        """Parse ``sample`` with every candidate delimiter at once.
+
+        One ``csv.reader`` per delimiter advances a row at a time in
+        lockstep. Parsing stops early once some delimiter has split the
+        first :attr:`AGREE_ROWS` rows into the same number (at least two)
+        of fields; otherwise every row is read and the delimiter whose most
+        common field count covers the largest share of rows, at least
+        :attr:`AGREE_RATIO`, wins, ties going to the earlier entry of
+        :attr:`DELIMS`.
+        """
+        readers = {d: csv.reader(io.StringIO(sample), delimiter=d) for d in self.DELIMS}
+        rows: dict[str, list[list[str]]] = {d: [] for d in self.DELIMS}
+        # delimiters whose rows so far all have the same field count
+        uniform = set(self.DELIMS)
+        while readers:
+            for d in list(readers):
                 try:
-                    enc = chardet.detect(payload[:self.SAMPLE_SIZE]).get('encoding')
-                    if enc:
-                        logger.debug("Detected encoding via chardet: %s", enc)
-                        return enc
-                except Exception:
-                    logger.debug("Chardet failed, falling back to UTF-8")
-            return 'utf-8'
-
-    def detect_delimiter(self, sample: str) -> Optional[str]:
-        """Fallback method to detect the delimiter if csv.Sniffer fails."""
-        candidates = list(self.DELIMS)
-        scores = {}
-        for d in candidates:
-            counts = [ln.count(d) for ln in sample.splitlines() if ln.strip()]
-            if counts and len(set(counts)) == 1 and counts[0] > 0:
-                scores[d] = counts[0]
-        if scores:
-            delim = max(scores, key=scores.get)
-            logger.debug("Detected delimiter: %s", delim)
-            return delim
-        logger.debug("No consistent delimiter found")
-        return None
-
-    @lru_cache(maxsize=128)
-    def _analyze_sample(self, payload_hash: str, text_sample: str) -> tuple:
-        """Analyze a sample of text, cached by payload hash."""
+                    row = next(readers[d])
+                except StopIteration:
+                    del readers[d]
+                    continue
+                except csv.Error:
+                    del readers[d]
+                    rows[d] = []
+                    continue
+                if not row:
+                    continue
+                seen = rows[d]
+                if seen and len(row) != len(seen[0]):
+                    uniform.discard(d)
+                seen.append(row)
+            for d in self.DELIMS:
+                seen = rows[d]
+                if d in uniform and len(seen) >= self.AGREE_ROWS and len(seen[0]) > 1:
+                    logger.debug("Rows agree on delimiter: %r", d)
+                    return d, seen
+
+        best, best_key = None, None
+        for d in self.DELIMS:
+            seen = rows[d]
+            if not seen:
+                continue
+            width, agree = Counter(len(r) for r in seen).most_common(1)[0]
+            if width < 2:
+                continue
+            key = agree / len(seen)
+            if key < self.AGREE_RATIO:
+                continue
+            if best_key is None or key > best_key:
+                best, best_key = d, key
+        logger.debug("Detected delimiter: %r", best)
+        return best, rows[best] if best is not None else []
+
+    @staticmethod
+    def _has_header(rows: list[list[str]]) -> bool:
+        """Guess whether ``rows[0]`` is a header, like ``csv.Sniffer.has_header``.
+
+        Columns whose values below the first row are all numeric, or all of
+        one length, vote for a header when the first row breaks the pattern
+        and against one when it does not.
+        """
+        header = rows[0]
+        width = len(header)
+        types: dict[int, object] = dict.fromkeys(range(width))
+        for row in rows[1:21]:
+            if len(row) != width:
+                continue
+            for col in list(types):
+                try:
+                    complex(row[col])
+                    kind: object = complex
+                except (ValueError, OverflowError):
+                    kind = len(row[col])
+                if kind != types[col]:
+                    if types[col] is None:
+                        types[col] = kind
+                    else:
+                        del types[col]
+        votes = 0
+        for col, kind in types.items():
+            if kind is None:
+                continue
+            if kind is complex:
+                try:
+                    complex(header[col])
+                except (ValueError, OverflowError):
+                    votes += 1
+                else:
+                    votes -= 1
+            elif len(header[col]) != kind:
+                votes += 1
+            else:
+                votes -= 1
+        return votes > 0
+
+    def _analyze_sample(self, text_sample: str) -> tuple:
+        """Analyze a sample of text in a single pass over its rows.
+
+        Results are cached per payload digest by :class:`EngineBase`.
+        """
         lines = text_sample.splitlines()[:self.SAMPLE_LINES]
         sample = '\n'.join(lines)
         if not sample.strip():
             logger.debug("Sample is empty after stripping")
             return None, None, [], 0.0, 0.0
 
-        # Detect delimiter
-        try:
-            dialect = csv.Sniffer().sniff(sample, self.DELIMS)
-            logger.debug("csv.Sniffer detected delimiter: %s", dialect.delimiter)
-        except Exception:
-            delim = self.detect_delimiter(sample)
-            if not delim:
-                logger.debug("Fallback delimiter detection failed")
-                return None, None, [], 0.0, 0.0
-            dialect = csv.excel()
-            dialect.delimiter = delim
-
-        # Parse rows
-        try:
-            reader = csv.reader(io.StringIO(sample), dialect)
-            rows = [row for row in reader if row]
-        except Exception as e:
-            logger.debug("CSV parsing failed: %s", e)
+        delim, rows = self._split_rows(sample)
+        if delim is None:
+            logger.debug("No consistent delimiter found")
             return None, None, [], 0.0, 0.0
 
         if len(rows) < self.MIN_ROWS:
@@ -119,22 +166,15 @@ class CSVEngine(EngineBase):
             return None, None, [], 0.0, 0.0
 
         # Analyze column consistency
-        column_counts = [len(r) for r in rows]
-        if not column_counts:
-            return None, None, [], 0.0, 0.0
-        most_common_count = max(set(column_counts), key=column_counts.count)
-        consistency_ratio = column_counts.count(most_common_count) / len(rows)
+        most_common_count, agree = Counter(len(r) for r in rows).most_common(1)[0]
+        consistency_ratio = agree / len(rows)
         token_count = sum(len(self._TOKEN_RE.findall(ln)) for ln in lines)
         total_chars = sum(len(ln) for ln in lines)
         token_ratio = token_count / total_chars if total_chars > 0 else 0
 
-        try:
-            has_header = csv.Sniffer().has_header(sample)
-        except Exception:
-            logger.debug("csv.Sniffer.has_header failed")
-            has_header = False
+        has_header = self._has_header(rows)
 
-        return dialect, has_header, rows, consistency_ratio, token_ratio
+        return delim, has_header, rows, consistency_ratio, token_ratio
 
     def _make_result(
         self,
@@ -144,8 +184,8 @@ class CSVEngine(EngineBase):
         partial: bool = False,
         magic_len: Optional[int] = None,
         consistency_ratio: float = 1.0,
-    ) -> Result:
-        """Create a Result object with detailed breakdown."""
+    ) -> RawResult:
+        """Create a RawResult with detailed breakdown."""
         breakdown = {
             "token<|control630|>": round(token_ratio, 3),
             "partial": partial,
@@ -153,46 +193,42 @@ class CSVEngine(EngineBase):
         }
         if magic_len is not None:
             breakdown["magic_len"] = magic_len
-        cand = Candidate(
+        cand = RawCandidate(
             media_type="text/csv",
             extension="csv",
             confidence=conf,
             breakdown=breakdown,
         )
-        return Result(candidates=[cand])
+        return RawResult(candidates=[cand])
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         """Detect if the payload is a CSV file with improved robustness and performance."""
         # Check libmagic first
-        if _magic is not None:
-            try:
-                mime = _magic.from_buffer(payload[:self.SAMPLE_SIZE])
-                logger.debug("libmagic MIME: %s", mime)
-                if mime and "csv" in mime.lower():
-                    ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "csv"
-                    cand = Candidate(
-                        media_type=mime,
-                        extension=ext,
-                        confidence=self.MAGIC_CONFIDENCE,
-                        breakdown={"libmagic": True},
-                    )
-                    return Result(candidates=[cand])
-            except Exception as e:
-                logger.warning("libmagic failed: %s", e)
+        ctx = DetectionContext.of(payload)
+        mime = ctx.magic_mime()
+        logger.debug("libmagic MIME: %s", mime)
+        if mime and "csv" in mime.lower():
+            ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "csv"
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=self.MAGIC_CONFIDENCE,
+                breakdown={"libmagic": True},
+            )
+            return RawResult(candidates=[cand])
 
         # Sample and decode
         payload_sample = payload[:self.SAMPLE_SIZE]
-        encoding = self.detect_encoding(payload_sample)
-        try:
-            text_sample = payload_sample.decode(encoding, errors='replace')
-        except Exception as e:
-            logger.debug("Decoding failed with %s: %s", encoding, e)
-            return Result(candidates=[])
+        encoding = ctx.encoding
+        text_sample = ctx.decode(encoding, 'replace', self.SAMPLE_SIZE)
+        if text_sample is None:
+            logger.debug("Decoding failed with %s", encoding)
+            return RawResult(candidates=[])
 
         # Check for binary data
-        if any(ord(c) < 32 and ord(c) not in (9, 10, 13) for c in text_sample):
+        if self._CONTROL_RE.search(text_sample):
             logger.debug("Binary data detected in sample")
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         # Check magic patterns
         magic_len = None
@@ -202,15 +238,13 @@ class CSVEngine(EngineBase):
                 logger.debug("Magic pattern matched: %s", m)
                 break
 
-        # Analyze sample with caching
-        payload_hash = hashlib.md5(payload_sample).hexdigest()
-        dialect, has_header, rows, consistency_ratio, token_ratio = self._analyze_sample(payload_hash, text_sample)
+        delim, has_header, rows, consistency_ratio, token_ratio = self._analyze_sample(text_sample)
         if not rows:
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         if consistency_ratio < self.CONSISTENCY_THRESHOLD:
             logger.debug("Consistency ratio too low: %.2f", consistency_ratio)
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         # Calculate confidence
         base_conf = self.MEDIUM_CONFIDENCE
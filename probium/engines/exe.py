@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _MZ = b"MZ"
 class EXEEngine(EngineBase):
     name = "exe"
     cost = 0.05
+    magic = ((_MZ, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_MZ):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/vnd.microsoft.portable-executable",
                 extension="exe",
                 confidence=score_magic(len(_MZ)),
                 breakdown={"magic_len": float(len(_MZ))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
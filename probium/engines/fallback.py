@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -9,10 +9,10 @@ class OctetEngine(EngineBase):
     name = "fallback-engine"
     cost = 100.0
 
-    def sniff(self, payload: bytes) -> Result:
-        return Result(
+    def sniff(self, payload: bytes) -> RawResult:
+        return RawResult(
             candidates=[
-                Candidate(
+                RawCandidate(
                     media_type="*UNSAFE* / *NO ENGINE*",
                     confidence=0.0,
                 )
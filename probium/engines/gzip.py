@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -10,14 +10,15 @@ _GZIP_MAGIC = b"\x1f\x8b"
 class GzipEngine(EngineBase):
     name = "gzip"
     cost = 0.1
+    magic = ((_GZIP_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_GZIP_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/gzip",
                 extension="gz",
                 confidence=score_magic(len(_GZIP_MAGIC)),
                 breakdown={"magic_len": float(len(_GZIP_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
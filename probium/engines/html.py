@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -10,15 +10,16 @@ _HTML_MAGIC = b"<html"
 class HTMLEngine(EngineBase):
     name = "html"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         window = payload[:32].lower()
         if _HTML_MAGIC in window:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/html",
                 extension="html",
                 confidence=score_magic(len(_HTML_MAGIC)),
                 breakdown={"magic_len": float(len(_HTML_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _ICO_MAGIC = b"\x00\x00\x01\x00"
 class IcoEngine(EngineBase):
     name = "ico"
     cost = 0.1
+    magic = ((_ICO_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_ICO_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="image/x-icon",
                 extension="ico",
                 confidence=score_magic(len(_ICO_MAGIC)),
                 breakdown={"magic_len": float(len(_ICO_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -8,12 +8,13 @@ from ..registry import register
 class ImageEngine(EngineBase):
     name = "image"
     cost = 0.05
+    magic = ((b"\xff\xd8\xff", 0), (b"GIF87a", 0), (b"GIF89a", 0))
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         cand = []
         if payload.startswith(b"\xff\xd8\xff"):
             cand.append(
-                Candidate(
+                RawCandidate(
                     media_type="image/jpeg",
                     extension="jpg",
                     confidence=score_magic(3),
@@ -22,11 +23,11 @@ class ImageEngine(EngineBase):
             )
         elif payload.startswith(b"GIF87a") or payload.startswith(b"GIF89a"):
             cand.append(
-                Candidate(
+                RawCandidate(
                     media_type="image/gif",
                     extension="gif",
                     confidence=score_magic(6),
                     breakdown={"magic_len": 6.0},
                 )
             )
-        return Result(candidates=cand)
+        return RawResult(candidates=cand)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -9,18 +10,16 @@ from ..registry import register
 class INIEngine(EngineBase):
     name = "ini"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
-        try:
-            text = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return Result(candidates=[])
+    def sniff(self, payload: bytes) -> RawResult:
+        text = DetectionContext.of(payload).text
         if text.lstrip().startswith("[") and "]" in text and "=" in text:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-ini",
                 extension="ini",
                 confidence=score_tokens(1.0),
                 breakdown={"token_ratio": 1.0},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
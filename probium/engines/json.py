@@ -1,17 +1,91 @@
 from __future__ import annotations
-import json
 import re
 import logging
 import mimetypes
 from ..scoring import score_tokens, score_magic
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
-from ..libmagic import load_magic
 
 logger = logging.getLogger(__name__)
 
-_magic = load_magic()
+# one token after optional whitespace: punctuation, a string or a scalar
+_LEX = re.compile(
+    r"""[ \t\n\r]*(?:
+        ([{}\[\],:])
+      | ("(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*")
+      | (-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null)
+    )""",
+    re.X,
+)
+# what may be left when the input stops in the middle of a token
+_PARTIAL = re.compile(
+    r"""[ \t\n\r]*(?:
+        "(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*(?:\\(?:u[0-9a-fA-F]{0,3})?)?
+      | -?(?:0|[1-9][0-9]*)(?:\.[0-9]*)?(?:[eE][+-]?)?
+      | -
+      | t(?:r(?:u)?)? | f(?:a(?:l(?:s)?)?)? | n(?:u(?:l)?)?
+    )?\Z""",
+    re.X,
+)
+_OPEN = re.compile(r"[\{\[]")
+
+# what the scanner expects next
+_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY, _COLON, _NEXT = range(6)
+# outcome of a scan
+DONE, MORE = "done", "more"
+
+
+def _scan(text: str, pos: int, limit: int) -> tuple[str | None, int]:
+    """Walk the JSON value starting at ``text[pos]`` without building it.
+
+    Only ``text[:limit]`` is looked at. Returns ``(DONE, end)`` when a
+    whole value ends at ``end``, ``(MORE, limit)`` when the window runs out
+    with every token so far consistent, and ``(None, at)`` when the token
+    at ``at`` cannot appear where it does.
+    """
+    stack: list[str] = []
+    expect = _VALUE
+    while True:
+        m = _LEX.match(text, pos, limit)
+        if m is None:
+            if _PARTIAL.match(text, pos, limit):
+                return MORE, limit
+            return None, pos
+        punct, string, _ = m.groups()
+        at = m.start(m.lastindex)
+        pos = m.end()
+        if string is not None and expect in (_KEY, _FIRST_KEY):
+            expect = _COLON
+            continue
+        if punct is None or punct in "{[":
+            if expect not in (_VALUE, _FIRST_VALUE):
+                return None, at
+            if punct is not None:
+                stack.append(punct)
+                expect = _FIRST_KEY if punct == "{" else _FIRST_VALUE
+                continue
+        elif punct == ":":
+            if expect != _COLON:
+                return None, at
+            expect = _VALUE
+            continue
+        elif punct == ",":
+            if expect != _NEXT:
+                return None, at
+            expect = _KEY if stack[-1] == "{" else _VALUE
+            continue
+        else:
+            opener = "{" if punct == "}" else "["
+            first = _FIRST_KEY if punct == "}" else _FIRST_VALUE
+            if not stack or stack[-1] != opener or expect not in (first, _NEXT):
+                return None, at
+            stack.pop()
+        # a value just ended
+        if not stack:
+            return DONE, pos
+        expect = _NEXT
 
 
 @register
@@ -22,8 +96,11 @@ class JSONEngine(EngineBase):
     #Estimated cost to run this engine (used for prioritization or budgeting)
 
     cost = 0.05
+    kind = "text"
 
     _TOKEN_RE = re.compile(r'[{}\[\]":,]')
+    # characters the structural scan may walk, across all attempts
+    BUDGET = 1 << 16
     #these are not magic number sigs, "_MAGIC" field is used as placeholding binary sig. (delimiter replacement)
     _MAGIC = [b'{', b'[']
 
@@ -34,14 +111,14 @@ class JSONEngine(EngineBase):
         partial: bool = False,
         *,
         magic_len: int | None = None,
-    ) -> Result:
-        """Helper to build a :class:`Result` object."""
+    ) -> RawResult:
+        """Helper to build a :class:`~probium.models.RawResult`."""
 
         breakdown = {"token_ratio": round(token_ratio, 3), "partial": partial}
         if magic_len is not None:
             breakdown["magic_len"] = float(magic_len)
 
-        cand = Candidate(
+        cand = RawCandidate(
             media_type="application/json",
             extension="json",
             confidence=conf,
@@ -49,47 +126,45 @@ class JSONEngine(EngineBase):
             breakdown=breakdown,
 
         )
-        return Result(candidates=[cand])
+        return RawResult(candidates=[cand])
 
     def _find_json_fragment(self, text: str) -> str | None:
-        """Return the first valid JSON snippet inside ``text`` if present."""
+        """Return the first valid JSON snippet inside ``text`` if present.
+
+        Scans from each ``{`` or ``[`` in the first :attr:`BUDGET`
+        characters until one closes, giving up once that many characters
+        have been walked in total.
+        """
 
-        decoder = json.JSONDecoder()
-        for match in re.finditer(r"[\{\[]", text):
+        spent = 0
+        for match in _OPEN.finditer(text, 0, self.BUDGET):
+            if spent >= self.BUDGET:
+                break
             start = match.start()
-            try:
-                obj, idx = decoder.raw_decode(text[start:])
-                end = start + idx
+            state, end = _scan(text, start, min(len(text), start + self.BUDGET - spent))
+            if state == DONE:
                 return text[start:end]
-            except Exception:
-                continue
+            spent += max(end - start, 1)
         return None
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
 
         """Detect JSON using libmagic, magic bytes and structural analysis."""
 
-        if _magic is not None:
-            try:
-                mime = _magic.from_buffer(payload)
-            except Exception as exc:  # pragma: no cover - rare
-                logger.warning("libmagic failed: %s", exc)
-            else:
-                if mime and "json" in mime:
-                    ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "json"
-                    cand = Candidate(
-                        media_type=mime,
-                        extension=ext,
-                        confidence=score_tokens(1.0),
-                        breakdown={"token_ratio": 1.0, "libmagic": True},
-                    )
-                    return Result(candidates=[cand])
-
-
-        try:
-            text = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return Result(candidates=[])
+        ctx = DetectionContext.of(payload)
+        mime = ctx.magic_mime()
+        if mime and "json" in mime:
+            ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "json"
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=score_tokens(1.0),
+                breakdown={"token_ratio": 1.0, "libmagic": True},
+            )
+            return RawResult(candidates=[cand])
+
+
+        text = ctx.text
 
 
         stripped = text.lstrip()
@@ -102,33 +177,27 @@ class JSONEngine(EngineBase):
 
         text = text.strip()
         if not text:
-            return Result(candidates=[])
-        token_count = len(self._TOKEN_RE.findall(text))
-        token_ratio = token_count / max(len(text), 1)
+            return RawResult(candidates=[])
+        window = text[:self.BUDGET]
+        token_count = len(self._TOKEN_RE.findall(window))
+        token_ratio = token_count / max(len(window), 1)
 
-        try:
-            json.loads(text) #if not magic, check common JSON limiters, count those and then calc confidence score based on known variables.
+        state, end = _scan(text, 0, len(window))
+        if state == DONE and end == len(text):
             conf = score_tokens(1.0)
             if magic_hit:
                 conf = max(conf, score_magic(len(magic_hit)))
             return self._make_result(conf, token_ratio, magic_len=len(magic_hit) if magic_hit else None)
 
-        except Exception:
-            pass
-
-        frag = self._find_json_fragment(text)
-        if frag is not None:
-            try:
-                json.loads(frag)
-                conf = score_tokens(min(0.9, token_ratio))
-                if magic_hit:
-                    conf = max(conf, score_magic(len(magic_hit)))
-                return self._make_result(conf, token_ratio, partial=True, magic_len=len(magic_hit) if magic_hit else None)
-
-            except Exception:
-                pass
+        # a consistent document cut short by the budget or the read cap
+        truncated = state == MORE and (len(window) < len(text) or not ctx.complete)
+        if (truncated and magic_hit) or self._find_json_fragment(text) is not None:
+            conf = score_tokens(min(0.9, token_ratio))
+            if magic_hit:
+                conf = max(conf, score_magic(len(magic_hit)))
+            return self._make_result(conf, token_ratio, partial=True, magic_len=len(magic_hit) if magic_hit else None)
 
-        if token_ratio > 0.3 and ":" in text:
+        if token_ratio > 0.3 and ":" in window:
             conf = score_tokens(min(token_ratio, 0.8))
 
             if magic_hit:
@@ -136,4 +205,4 @@ class JSONEngine(EngineBase):
             return self._make_result(conf, token_ratio, partial=True, magic_len=len(magic_hit) if magic_hit else None)
 
 
-        return Result(candidates=[])
+        return RawResult(candidates=[])
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -9,26 +10,24 @@ from ..registry import register
 class KotlinEngine(EngineBase):
     name = "kotlin"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
-        try:
-            text = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return Result(candidates=[])
+    def sniff(self, payload: bytes) -> RawResult:
+        text = DetectionContext.of(payload).text
         if "fun main" in text and "println(" in text:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-kotlin",
                 extension="kt",
                 confidence=score_tokens(1.0),
                 breakdown={"token_ratio": 1.0},
             )
-            return Result(candidates=[cand])
+            return RawResult(candidates=[cand])
         if "class " in text and "val " in text:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-kotlin",
                 extension="kt",
                 confidence=score_tokens(0.05),
                 breakdown={"token_ratio": 0.05},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,47 +1,174 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
+from ..context import DetectionContext
 from ..registry import register
-import io
+import struct
+
+# compound file header fields up to the DIFAT array, and the array itself
+_HEADER = struct.Struct("<8s16s5H6s9L")
+_HEADER_DIFAT = 109
+_HEADER_SIZE = 512
+# directory entry: UTF-16 name, name length, type, colour, left/right/child
+_ENTRY = struct.Struct("<64sHBB3L")
+_ENTRY_SIZE = 128
+_STREAM, _ROOT = 2, 5
+_NOSTREAM = 0xFFFFFFFF
+_MAXREGSECT = 0xFFFFFFFA
+
+# top-level stream names (lower case) -> (extension, media type), by priority
+_STREAMS = (
+    (("worddocument",), ("doc", "application/msword")),
+    (("workbook", "book"), ("xls", "application/vnd.ms-excel")),
+    (("powerpoint document",), ("ppt", "application/vnd.ms-powerpoint")),
+)
+_GENERIC = ("cfb", "application/vnd.ms-office")
+
+
+class _BadCFB(Exception):
+    pass
+
+
+class _CompoundFile:
+    """Just enough of a compound file reader to list top-level streams.
+
+    Sectors are fetched one at a time with range reads: the header, the FAT
+    sectors covering the directory chain and the directory sectors holding
+    the root's children. Nothing else in the file is touched.
+    """
+
+    def __init__(self, ctx: DetectionContext, base: int) -> None:
+        self._ctx = ctx
+        self._base = base
+        head = ctx.read(base, _HEADER_SIZE)
+        if len(head) < _HEADER_SIZE:
+            raise _BadCFB("truncated header")
+        fields = _HEADER.unpack_from(head)
+        shift = fields[5]
+        if shift not in (9, 12):
+            raise _BadCFB(f"bad sector shift {shift}")
+        self.sector_size = 1 << shift
+        self.first_dir = fields[10]
+        self._first_difat = fields[15]
+        self._difat = list(struct.unpack_from(f"<{_HEADER_DIFAT}L", head, _HEADER.size))
+        self._difat_next = self._first_difat
+        self._fat: dict[int, tuple[int, ...]] = {}
+        # a chain can never be longer than the file has sectors
+        self.max_sectors = ctx.size // self.sector_size + 1
+
+    def sector(self, sid: int) -> bytes:
+        if sid > _MAXREGSECT:
+            raise _BadCFB(f"bad sector id {sid:#x}")
+        data = self._ctx.read(self._base + (sid + 1) * self.sector_size, self.sector_size)
+        if len(data) < self.sector_size:
+            raise _BadCFB("truncated sector")
+        return data
+
+    def _fat_sector(self, index: int) -> int:
+        # extend the DIFAT only as far as ``index`` needs
+        per = self.sector_size // 4 - 1
+        hops = 0
+        while index >= len(self._difat):
+            if self._difat_next > _MAXREGSECT or hops > self.max_sectors:
+                raise _BadCFB("FAT sector out of range")
+            entries = struct.unpack(f"<{per + 1}L", self.sector(self._difat_next))
+            self._difat.extend(entries[:per])
+            self._difat_next = entries[per]
+            hops += 1
+        return self._difat[index]
+
+    def next(self, sid: int) -> int:
+        """Return the sector following ``sid`` in its chain."""
+        per = self.sector_size // 4
+        index = sid // per
+        table = self._fat.get(index)
+        if table is None:
+            table = struct.unpack(f"<{per}L", self.sector(self._fat_sector(index)))
+            self._fat[index] = table
+        return table[sid % per]
+
+    def top_level(self):
+        """Yield ``(name, type)`` for each child of the root entry.
+
+        Directory sectors are read in chain order only until every sibling
+        reachable from the root's child is known, which for Office files is
+        usually the first sector or two.
+        """
+        per = self.sector_size // _ENTRY_SIZE
+        entries: dict[int, tuple[str, int, int, int, int]] = {}
+        sid = self.first_dir
+        loaded = 0
+        # entry ids still to visit; the root entry comes first
+        todo = [0]
+        seen: set[int] = set()
+        while todo:
+            eid = todo[-1]
+            while eid not in entries:
+                if sid > _MAXREGSECT or loaded >= self.max_sectors:
+                    raise _BadCFB("directory entry out of range")
+                data = self.sector(sid)
+                for i in range(per):
+                    raw, nlen, kind, _, left, right, child = _ENTRY.unpack_from(
+                        data, i * _ENTRY_SIZE
+                    )
+                    name = raw[: max(nlen - 2, 0)].decode("utf-16-le", "replace")
+                    entries[loaded * per + i] = (name, kind, left, right, child)
+                loaded += 1
+                sid = self.next(sid)
+            todo.pop()
+            if eid in seen:
+                raise _BadCFB("directory loop")
+            seen.add(eid)
+            name, kind, left, right, child = entries[eid]
+            if eid == 0:
+                if kind != _ROOT:
+                    raise _BadCFB("first entry is not the root")
+                if child != _NOSTREAM:
+                    todo.append(child)
+                continue
+            yield name, kind
+            for link in (right, left):
+                if link != _NOSTREAM:
+                    todo.append(link)
+
+
+def _classify(ctx: DetectionContext, base: int) -> tuple[str, str]:
+    """Return ``(extension, media type)`` from the root's streams."""
+    streams: set[str] = set()
+    for name, kind in _CompoundFile(ctx, base).top_level():
+        if kind != _STREAM:
+            continue
+        name = name.lower()
+        if name in _STREAMS[0][0]:
+            return _STREAMS[0][1]  # nothing outranks a Word document
+        streams.add(name)
+    for names, found in _STREAMS[1:]:
+        if streams.intersection(names):
+            return found
+    return _GENERIC
 
-try:  # optional dependency
-    import olefile
-except Exception:  # pragma: no cover - missing dependency
-    olefile = None
 
 @register
 class LegacyOfficeEngine(EngineBase):
     name = "legacyoffice"
     cost = 0.1
     _MAGIC = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         window = payload[:1 << 20]  # scan first 1MB
         idx = window.find(self._MAGIC)
         cand = []
         if idx != -1:
-            if olefile is None:
-                return Result(candidates=[])
             try:
-                ole = olefile.OleFileIO(io.BytesIO(payload))
-                streams = ole.listdir(streams=True)
-                flat_streams = ["/".join(path) for path in streams]
-
-                if any(s.lower() == "worddocument" for s in flat_streams):
-                    ext, mtype = "doc", "application/msword"
-                elif any(s.lower() in ("workbook", "book") for s in flat_streams):
-                    ext, mtype = "xls", "application/vnd.ms-excel"
-                elif any(s.lower() == "powerpoint document" for s in flat_streams):
-                    ext, mtype = "ppt", "application/vnd.ms-powerpoint"
-                else:
-                    ext, mtype = "cfb", "application/vnd.ms-office"
+                # only the header and the directory sectors are read
+                ext, mtype = _classify(DetectionContext.of(payload), idx)
 
                 #conf = score_magic(len(self._MAGIC))
                 conf = 1.0
                 if idx != 0:
                     conf *= 0.9
                 cand.append(
-                    Candidate(
+                    RawCandidate(
                         media_type=mtype,
                         extension=ext,
                         confidence=conf,
@@ -50,11 +177,11 @@ class LegacyOfficeEngine(EngineBase):
                 )
             except Exception:
                 cand.append(
-                    Candidate(
+                    RawCandidate(
                         media_type="application/vnd.ms-office",
                         extension="cfb",
                         confidence=0.5,
                         breakdown={"offset": float(idx), "error": -1},
                     )
                 )
-        return Result(candidates=cand)
\ No newline at end of file
+        return RawResult(candidates=cand)
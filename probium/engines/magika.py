@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -23,12 +23,12 @@ class MagikaEngine(EngineBase):
             raise RuntimeError("Google Magika library is required for this engine")
         self._magika = Magika()
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         res = self._magika.identify_bytes(payload)
         info = res.prediction.output
-        cand = Candidate(
+        cand = RawCandidate(
             media_type=info.mime_type,
             extension=info.extensions[0] if info.extensions else None,
             confidence=float(res.prediction.score),
         )
-        return Result(candidates=[cand])
+        return RawResult(candidates=[cand])
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -9,19 +10,18 @@ from ..registry import register
 class MakefileEngine(EngineBase):
     name = "makefile"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
-        try:
-            text = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return Result(candidates=[])
-        first = text.splitlines()[0] if text else ""
+    def sniff(self, payload: bytes) -> RawResult:
+        ctx = DetectionContext.of(payload)
+        text = ctx.text
+        first = ctx.lines[0] if text else ""
         if ":" in first and ("$(" in text or "\n\t" in text):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-makefile",
                 extension="mk",
                 confidence=score_tokens(1.0),
                 breakdown={"token_ratio": 1.0},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -10,14 +10,15 @@ _ID3_MAGIC = b"ID3"
 class MP3Engine(EngineBase):
     name = "mp3"
     cost = 0.1
+    magic = ((_ID3_MAGIC, 0), (b"\xff\xfb", 0))
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_ID3_MAGIC) or payload[:2] == b"\xff\xfb":
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="audio/mpeg",
                 extension="mp3",
                 confidence=score_magic(len(_ID3_MAGIC)),
                 breakdown={"magic_len": float(len(_ID3_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -9,14 +9,16 @@ class MP4Engine(EngineBase):
     name = "mp4"
     cost = 0.2
     _MAGIC = b"ftyp"
+    magic = ((_MAGIC, 4),)
+    min_length = 12
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if len(payload) >= 12 and payload[4:8] == self._MAGIC:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="video/mp4",
                 extension="mp4",
                 confidence=score_magic(len(self._MAGIC)),
                 breakdown={"magic_len": float(len(self._MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,73 +1,135 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
+from ..context import DetectionContext
 from ..registry import register
 import re
 
 
+# windows read from each end of a file larger than HEAD_WINDOW + TAIL_WINDOW
+HEAD_WINDOW = 64 * 1024
+TAIL_WINDOW = 64 * 1024
+
+# version header, and how far into the payload it may sit
+_HEADER = b"%PDF-"
+MAGIC_WINDOW = 1024
+
+# structural features needed to call a payload a PDF
+THRESHOLD = 5
+
+# every keyword the scanner reacts to; longer keywords that contain shorter
+# ones come first so each occurrence is reported once
+_TOKENS = re.compile(
+    rb"%%EOF|startxref|xref|endobj|obj|endstream|stream"
+    rb"|/Type\s*/(?:Catalog|Page)|/PTEX\.PageNumber"
+)
+# what must precede ``obj`` (object and generation numbers) and follow
+# ``startxref`` (the xref offset and the end marker); both are only ever
+# matched at one position against a few bytes
+_OBJ_HEADER = re.compile(rb"\d+\s+\d+\s*$")
+_OBJ_LOOKBACK = 48
+_FINAL_XREF = re.compile(rb"\s*\d+\s*%%EOF")
+
+
+def _windows(ctx: DetectionContext) -> list[bytes]:
+    """Return the regions of the file worth scanning, in file order.
+
+    Only a payload with a version header near its start is read past the
+    scanned bytes; anything else is scanned as it stands, so that the
+    detection stays keyed by the payload digest.
+    """
+    if ctx.payload.find(_HEADER, 0, MAGIC_WINDOW) == -1:
+        return [ctx.payload]
+    if ctx.size <= HEAD_WINDOW + TAIL_WINDOW:
+        return [ctx.head(ctx.size)]
+    # objects open the file, xref/trailer/startxref close it
+    return [ctx.head(HEAD_WINDOW), ctx.tail(TAIL_WINDOW)]
+
+
+def _structure(windows: list[bytes]) -> int:
+    """Count the PDF structural features found in ``windows``.
+
+    A single pass over keyword tokens with no backtracking regexes; features
+    that pair an opening and a closing keyword (``obj``/``endobj``,
+    ``stream``/``endstream``, ``xref``/``startxref``) carry over from one
+    window to the next. Scanning stops once :data:`THRESHOLD` is reached.
+    """
+    found: set[str] = set()
+    obj = stream = xref = False
+    for window in windows:
+        for m in _TOKENS.finditer(window):
+            tok = m.group()
+            if tok == b"%%EOF":
+                found.add("eof")
+            elif tok == b"startxref":
+                found.add("xref")
+                if xref:
+                    found.add("xref_startxref")
+                if _FINAL_XREF.match(window, m.end()):
+                    found.add("final_xref_eof")
+            elif tok == b"xref":
+                found.add("xref")
+                xref = True
+            elif tok == b"obj":
+                head = window[max(m.start() - _OBJ_LOOKBACK, 0) : m.start()]
+                if _OBJ_HEADER.search(head):
+                    obj = True
+            elif tok == b"endobj":
+                if obj:
+                    found.add("obj_block")
+            elif tok == b"stream":
+                stream = True
+            elif tok == b"endstream":
+                if stream:
+                    found.add("stream_block")
+            elif tok.endswith(b"Catalog"):
+                found.add("catalog")
+            elif tok.endswith(b"Page"):
+                found.add("pages")
+            else:
+                found.add("ptex")
+            if len(found) >= THRESHOLD:
+                return len(found)
+    return len(found)
+
+
 @register
 class PDFEngine(EngineBase):
     name = "pdf"
     cost = 0.1
-    _MAGIC = b"%PDF-" # in-house
+    _MAGIC = _HEADER # in-house
 
-    def sniff(self, payload: bytes) -> Result:
-        window = payload[:1024]#check first 8 bytes
+    def sniff(self, payload: bytes) -> RawResult:
+        window = payload[:MAGIC_WINDOW]#check first 8 bytes
         idx = window.find(self._MAGIC)
         cand = []
-   
+
         #if idx != -1:
         #conf = score_magic(len(self._MAGIC))
         conf = 1
-        
-        eof = b'%%EOF' in payload
-        xref = b'xref' in payload
-        trailer = b'trailer' in payload
-
-        cat_pattern = rb'/Type\s*/Catalog'
-        catalog = re.search(cat_pattern, payload) is not None
-
-        page_pattern = rb'/Type\s*/Page'
-        pages = re.search(page_pattern, payload) is not None
-        
-        obj_endobj_pattern = rb'\d+\s+\d+\s*obj.*?endobj'
-        contains_obj_block = re.search(obj_endobj_pattern, payload, re.DOTALL | re.S) is not None
 
-        final_xref_eof_pattern = rb'startxref\s*\d+\s*%%EOF'
-        contains_final_xref_eof = re.search(final_xref_eof_pattern, payload, re.DOTALL | re.S) is not None
+        score = _structure(_windows(DetectionContext.of(payload)))
 
-        stream_pattern = rb'stream.*?endstream'
-        contains_stream = re.search(stream_pattern, payload, re.DOTALL | re.S) is not None
-
-        ptex = b'/PTEX.PageNumber' in payload
-       
-
-        xref_startxref_pattern = rb'xref.*?startxref'
-        contains_xtos = re.search(xref_startxref_pattern, payload, re.DOTALL | re.S) is not None
-
-
-        score = eof + xref + contains_final_xref_eof + contains_obj_block + ptex + contains_stream + pages + catalog + contains_xtos
-    
-        if score >= 5:
+        if score >= THRESHOLD:
             conf = 1.0
 
             if idx == -1:
                 cand.append(
-                Candidate(
+                RawCandidate(
                     media_type="application/pdf",
                     extension="pdf",
                     confidence=conf,
                     breakdown={"offset": float(idx), "magic_len": float(len(self._MAGIC))},
                 ))
-                return Result(candidates=cand, error="PDF file is corrupted, no PDF version header found")
+                return RawResult(candidates=cand, error="PDF file is corrupted, no PDF version header found")
             else:
                 cand.append(
-                Candidate(
+                RawCandidate(
                     media_type="application/pdf",
                     extension="pdf",
                     confidence=conf,
                     breakdown={"offset": float(idx), "magic_len": float(len(self._MAGIC))},
                 ))
-        
-        return Result(candidates=cand)
+
+        return RawResult(candidates=cand)
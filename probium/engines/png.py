@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
@@ -10,14 +10,15 @@ _PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
 class PNGEngine(EngineBase):
     name = "png"
     cost = 0.05
+    magic = ((_PNG_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_PNG_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="image/png",
                 extension="png",
                 confidence=score_magic(len(_PNG_MAGIC)),
                 breakdown={"magic_len": float(len(_PNG_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _RAR_MAGIC = b"Rar!"
 class RarEngine(EngineBase):
     name = "rar"
     cost = 0.1
+    magic = ((_RAR_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_RAR_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/vnd.rar",
                 extension="rar",
                 confidence=score_magic(len(_RAR_MAGIC)),
                 breakdown={"magic_len": float(len(_RAR_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
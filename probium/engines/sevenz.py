@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _SEVENZ_MAGIC = b"7z\xBC\xAF\x27\x1C"
 class SevenZEngine(EngineBase):
     name = "7z"
     cost = 0.1
+    magic = ((_SEVENZ_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_SEVENZ_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/x-7z-compressed",
                 extension="7z",
                 confidence=score_magic(len(_SEVENZ_MAGIC)),
                 breakdown={"magic_len": float(len(_SEVENZ_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,15 +11,16 @@ _SHEBANGS = [b"#!/bin/sh", b"#!/bin/bash", b"#!/usr/bin/env bash", b"#!/usr/bin/
 class SHEngine(EngineBase):
     name = "sh"
     cost = 0.05
+    magic = tuple((sig, 0) for sig in _SHEBANGS)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         for magic in _SHEBANGS:
             if payload.startswith(magic):
-                cand = Candidate(
+                cand = RawCandidate(
                     media_type="application/x-sh",
                     extension="sh",
                     confidence=score_tokens(1.0),
                     breakdown={"token_ratio": 1.0},
                 )
-                return Result(candidates=[cand])
-        return Result(candidates=[])
+                return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
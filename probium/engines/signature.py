@@ -1,16 +1,16 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 import logging
 import mimetypes
-from ..libmagic import load_magic
+from ..signatures import SignatureIndex
 
 logger = logging.getLogger(__name__)
 
-_magic = load_magic()
 
 # quick byte signature lookups for common formats
 _SIGNATURES: dict[bytes, tuple[str, str]] = {
@@ -34,7 +34,9 @@ _SIGNATURES: dict[bytes, tuple[str, str]] = {
     b"SQLite format 3\x00": ("application/vnd.sqlite3", "sqlite"),
 }
 
-_MAX_SIG_LEN = max(len(sig) for sig in _SIGNATURES)
+_INDEX: SignatureIndex[tuple[str, str]] = SignatureIndex(
+    (sig, 0, info) for sig, info in _SIGNATURES.items()
+)
 
 
 @register
@@ -44,31 +46,26 @@ class SignatureEngine(EngineBase):
     name = "signature"
     cost = 0.05
 
-    def sniff(self, payload: bytes) -> Result:
-        if _magic is not None:
-            try:
-                mime = _magic.from_buffer(payload)
-            except Exception as exc:  # pragma: no cover
-                logger.warning("libmagic failed: %s", exc)
-            else:
-                if mime:
-                    ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or None
-                    cand = Candidate(
-                        media_type=mime,
-                        extension=ext,
-                        confidence=score_tokens(0),
-                        breakdown={"token_ratio": 1.0},
-                    )
-                    return Result(candidates=[cand])
+    def sniff(self, payload: bytes) -> RawResult:
+        mime = DetectionContext.of(payload).magic_mime()
+        if mime:
+            ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or None
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=score_tokens(0),
+                breakdown={"token_ratio": 1.0},
+            )
+            return RawResult(candidates=[cand])
 
-        head = payload[:_MAX_SIG_LEN]
-        for sig, (mime, ext) in _SIGNATURES.items():
-            if head.startswith(sig):
-                cand = Candidate(
-                    media_type=mime,
-                    extension=ext,
-                    confidence=score_magic(len(sig)),
-                    breakdown={"magic_len": float(len(sig))},
-                )
-                return Result(candidates=[cand])
-        return Result(candidates=[])
+        hit = _INDEX.first(payload)
+        if hit is not None:
+            sig, _, (mime, ext) = hit
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=score_magic(len(sig)),
+                breakdown={"magic_len": float(len(sig))},
+            )
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,57 +1,50 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 import logging
 import mimetypes
-from ..libmagic import load_magic
 
 logger = logging.getLogger(__name__)
 
-_magic = load_magic()
 
 @register
 class SwiftEngine(EngineBase):
     name = "swift"
     cost = 0.05
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
-        if _magic is not None:
-            try:
-                mime = _magic.from_buffer(payload)
-            except Exception as exc:  # pragma: no cover
-                logger.warning("libmagic failed: %s", exc)
-            else:
-                if mime and "swift" in mime:
-                    ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "swift"
-                    cand = Candidate(
-                        media_type=mime,
-                        extension=ext,
-                        confidence=score_tokens(1.0),
-                        breakdown={"token_ratio": 1.0},
-                    )
-                    return Result(candidates=[cand])
+    def sniff(self, payload: bytes) -> RawResult:
+        ctx = DetectionContext.of(payload)
+        mime = ctx.magic_mime()
+        if mime and "swift" in mime:
+            ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "swift"
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=score_tokens(1.0),
+                breakdown={"token_ratio": 1.0},
+            )
+            return RawResult(candidates=[cand])
 
-        try:
-            text = payload.decode("utf-8", errors="ignore")
-        except Exception:
-            return Result(candidates=[])
+        text = ctx.text
         if "import Swift" in text or "import Foundation" in text:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-swift",
                 extension="swift",
                 confidence=score_tokens(1.0),
                 breakdown={"token_ratio": 1.0},
             )
-            return Result(candidates=[cand])
+            return RawResult(candidates=[cand])
         if "func " in text and "let " in text:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/x-swift",
                 extension="swift",
                 confidence=score_tokens(0.05),
                 breakdown={"token_ratio": 0.05},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,16 @@ _TAR_MAGIC = b"ustar"
 class TAREngine(EngineBase):
     name = "tar"
     cost = 0.1
+    magic = ((_TAR_MAGIC, 257),)
+    min_length = 263
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if len(payload) > 262 and payload[257:262] == _TAR_MAGIC:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/x-tar",
                 extension="tar",
                 confidence=score_magic(len(_TAR_MAGIC)),
                 breakdown={"magic_len": float(len(_TAR_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
@@ -1,7 +1,7 @@
 from __future__ import annotations
-import string
+from ..context import PRINTABLE_WINDOW, DetectionContext
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -9,25 +9,23 @@ from ..registry import register
 class TextEngine(EngineBase):
     name = "text"
     cost = 1.0
+    kind = "text"
 
-    def sniff(self, payload: bytes) -> Result:
-        sample = payload[:512]
-        try:
-            text = sample.decode("utf-8")
-        except UnicodeDecodeError:
-            return Result(candidates=[])
-        printable = set(string.printable)
-        printable_count = sum(1 for c in text if c in printable or c in "\n\r\t")
-        ratio = printable_count / max(len(text), 1)
+    def sniff(self, payload: bytes) -> RawResult:
+        ctx = DetectionContext.of(payload)
+        text = ctx.decode("utf-8", "strict", PRINTABLE_WINDOW)
+        if text is None:
+            return RawResult(candidates=[])
+        ratio = ctx.printable_ratio
 
         if ratio > 0.95 and "<" not in text and ">" not in text:
             conf = score_tokens(ratio)
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="text/plain",
                 extension="txt",
                 confidence=conf,
                 breakdown={"token_ratio": ratio},
             )
-            return Result(candidates=[cand])
+            return RawResult(candidates=[cand])
 
-        return Result(candidates=[])
+        return RawResult(candidates=[])
@@ -7,7 +7,7 @@ import mimetypes
 import shutil
 import re
 import logging
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -24,13 +24,13 @@ class TridEngine(EngineBase):
     name = "trid"
     cost = 5.0
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         global _missing_warning_logged
         if _TRID_CMD is None:
             if not _missing_warning_logged:
                 logger.debug("trid command not found")
                 _missing_warning_logged = True
-            return Result(candidates=[])
+            return RawResult(candidates=[])
         with tempfile.NamedTemporaryFile(delete=False) as tmp:
             tmp.write(payload)
             tmp.flush()
@@ -40,14 +40,14 @@ class TridEngine(EngineBase):
         except Exception as exc:
             logger.exception("trid execution failed")
             os.unlink(path)
-            return Result(candidates=[], error=str(exc))
+            return RawResult(candidates=[], error=str(exc))
         finally:
             if os.path.exists(path):
                 os.unlink(path)
 
         if proc.returncode != 0:
             logger.warning("trid returned non-zero exit status %s", proc.returncode)
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         candidates = []
         pattern = re.compile(r"([0-9.]+)% \(([^)]+)\) (.+)")
@@ -59,5 +59,5 @@ class TridEngine(EngineBase):
             ext = m.group(2).strip().lstrip('.')
             desc = m.group(3).strip()
             mime = mimetypes.guess_type(f"dummy.{ext}")[0] or "application/octet-stream"
-            candidates.append(Candidate(media_type=mime, extension=ext, confidence=conf, breakdown={"trid": desc}))
-        return Result(candidates=candidates)
+            candidates.append(RawCandidate(media_type=mime, extension=ext, confidence=conf, breakdown={"trid": desc}))
+        return RawResult(candidates=candidates)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,16 @@ class WAVEngine(EngineBase):
     cost = 0.1
     _MAGIC = b"RIFF"
     _FMT = b"WAVE"
+    magic = ((_MAGIC, 0),)
+    min_length = 12
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if len(payload) >= 12 and payload[:4] == self._MAGIC and payload[8:12] == self._FMT:
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="audio/wav",
                 extension="wav",
                 confidence=score_magic(len(self._MAGIC)),
                 breakdown={"magic_len": float(len(self._MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
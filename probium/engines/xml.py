@@ -2,24 +2,16 @@ from __future__ import annotations
 import logging
 import mimetypes
 import re
-import xml.etree.ElementTree as ET
-from functools import lru_cache
+from xml.parsers import expat
 
-try:
-    import chardet  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    chardet = None
-
-from ..models import Candidate, Result
+from ..context import DetectionContext, detect_encoding
+from ..models import RawCandidate, RawResult
 from ..scoring import score_magic, score_tokens
 from .base import EngineBase
 from ..registry import register
-from ..libmagic import load_magic
 
 logger = logging.getLogger(__name__)
 
-_magic = load_magic()
-
 
 @register
 class XMLEngine(EngineBase):
@@ -27,8 +19,11 @@ class XMLEngine(EngineBase):
 
     name = "xml"
     cost = 0.05
+    kind = "text"
 
     SAMPLE_SIZE = 4096
+    FEED_SIZE = 512  # characters handed to the parser at a time
+    CHILDREN = 3  # elements after the root that settle a parse attempt
     TOKEN_RATIO_THRESHOLD = 0.05
 
     BOM_UTF8 = b"\xEF\xBB\xBF"
@@ -43,76 +38,82 @@ class XMLEngine(EngineBase):
     CLOSE_TAG_RE = re.compile(r"</[^>]+>")
 
     def detect_encoding(self, payload: bytes) -> str:
-        if payload.startswith(self.BOM_UTF8):
-            return "utf-8-sig"
-        if payload.startswith(self.BOM_UTF16_LE):
-            return "utf-16-le"
-        if payload.startswith(self.BOM_UTF16_BE):
-            return "utf-16-be"
-        if chardet is not None:
-            try:
-                enc = chardet.detect(payload[: self.SAMPLE_SIZE]).get("encoding")
-                if enc:
-                    return enc
-            except Exception:
-                pass
-        return "utf-8"
-
-    def _make_result(self, conf: float, breakdown: dict[str, float]) -> Result:
-        cand = Candidate(
+        return detect_encoding(payload)
+
+    def _make_result(self, conf: float, breakdown: dict[str, float]) -> RawResult:
+        cand = RawCandidate(
             media_type="application/xml",
             extension="xml",
             confidence=conf,
             breakdown=breakdown,
         )
-        return Result(candidates=[cand])
-
-    @lru_cache(maxsize=64)
-    def _parse_snippet(self, snippet: str) -> bool:
-        """Attempt to parse a snippet of XML, cached by content."""
+        return RawResult(candidates=[cand])
+
+    def _feed(self, window: str, whole: bool, wrap: bool) -> bool:
+        """Feed ``window`` to expat a slice at a time.
+
+        Stops with success once the root element and :attr:`CHILDREN`
+        more have started. Otherwise ``whole`` says whether ``window`` is
+        the entire document and so must also end well-formed. With
+        ``wrap`` the window is parsed as the content of a synthetic root,
+        which admits fragments with several top-level elements.
+        """
+        parser = expat.ParserCreate()
+        started = 0
+
+        def start(name, attrs):
+            nonlocal started
+            started += 1
+
+        parser.StartElementHandler = start
+        goal = self.CHILDREN + 1 + wrap
         try:
-            ET.fromstring(snippet)
-            return True
-        except Exception:
-            try:
-                ET.fromstring(f"<root>{snippet}</root>")
-                return True
-            except Exception:
-                return False
-
-    def sniff(self, payload: bytes) -> Result:
+            if wrap:
+                parser.Parse("<root>", False)
+            for pos in range(0, len(window), self.FEED_SIZE):
+                parser.Parse(window[pos : pos + self.FEED_SIZE], False)
+                if started >= goal:
+                    return True
+            if whole:
+                parser.Parse("</root>" if wrap else "", True)
+        except expat.ExpatError:
+            return False
+        return started > wrap
+
+    def _parse_prefix(self, window: str, whole: bool) -> bool:
+        """Whether ``window`` starts a well-formed document or fragment."""
+        return self._feed(window, whole, False) or self._feed(window, whole, True)
+
+    def sniff(self, payload: bytes) -> RawResult:
         """Return a detection result for the given payload."""
 
         # 1. libmagic check
-        if _magic is not None:
-            try:
-                mime = _magic.from_buffer(payload)
-            except Exception as exc:  # pragma: no cover - rare
-                logger.warning("libmagic failed: %s", exc)
-            else:
-                if mime and "xml" in mime:
-                    ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "xml"
-                    cand = Candidate(
-                        media_type=mime,
-                        extension=ext,
-                        confidence=score_tokens(1.0),
-                        breakdown={"libmagic": True},
-                    )
-                    return Result(candidates=[cand])
-
-        encoding = self.detect_encoding(payload)
-        try:
-            text = payload.decode(encoding, errors="replace")
-        except Exception:
-            return Result(candidates=[])
+        ctx = DetectionContext.of(payload)
+        mime = ctx.magic_mime()
+        if mime and "xml" in mime:
+            ext = (mimetypes.guess_extension(mime) or "").lstrip(".") or "xml"
+            cand = RawCandidate(
+                media_type=mime,
+                extension=ext,
+                confidence=score_tokens(1.0),
+                breakdown={"libmagic": True},
+            )
+            return RawResult(candidates=[cand])
+
+        # enough bytes for SAMPLE_SIZE characters in any encoding
+        text = ctx.decode(ctx.encoding, "replace", self.SAMPLE_SIZE * 4)
+        if text is None:
+            return RawResult(candidates=[])
 
         window = text[: self.SAMPLE_SIZE]
+        # depends on the source size; ctx.cache_key covers it for truncated payloads
+        whole = ctx.complete and len(window) == len(text) and len(ctx.payload) <= self.SAMPLE_SIZE * 4
         breakdown: dict[str, float] = {}
         confidence = 0.0
 
         token_ratio = len(self.TOKEN_RE.findall(window)) / max(len(window), 1)
         if token_ratio < self.TOKEN_RATIO_THRESHOLD / 2:
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         # 2. XML declaration / BOM
         if window.lstrip().startswith("<?xml"):
@@ -129,8 +130,8 @@ class XMLEngine(EngineBase):
             confidence = max(confidence, score_tokens(0.6))
             breakdown["doctype"] = 1.0
 
-        # 4. Parse attempt
-        if token_ratio > 0 and self._parse_snippet(window):
+        # 4. Parse attempt, stopping once the root and a few children are seen
+        if token_ratio > 0 and self._parse_prefix(window, whole):
             confidence = max(confidence, score_tokens(1.0))
             breakdown["parsed"] = 1.0
 
@@ -155,6 +156,6 @@ class XMLEngine(EngineBase):
         breakdown["token_ratio"] = round(token_ratio, 3)
 
         if confidence == 0:
-            return Result(candidates=[])
+            return RawResult(candidates=[])
 
         return self._make_result(confidence, breakdown)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from ..scoring import score_magic, score_tokens
-from ..models import Candidate, Result
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -11,14 +11,15 @@ _XZ_MAGIC = b"\xFD7zXZ\x00"
 class XzEngine(EngineBase):
     name = "xz"
     cost = 0.1
+    magic = ((_XZ_MAGIC, 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if payload.startswith(_XZ_MAGIC):
-            cand = Candidate(
+            cand = RawCandidate(
                 media_type="application/x-xz",
                 extension="xz",
                 confidence=score_magic(len(_XZ_MAGIC)),
                 breakdown={"magic_len": float(len(_XZ_MAGIC))},
             )
-            return Result(candidates=[cand])
-        return Result(candidates=[])
+            return RawResult(candidates=[cand])
+        return RawResult(candidates=[])
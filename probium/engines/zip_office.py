@@ -1,8 +1,11 @@
 #made for zip files - recursive scan example engine
 from __future__ import annotations
 from ..scoring import score_magic, score_tokens
-import zipfile, io
-from ..models import Candidate, Result
+import io
+import struct
+import zlib
+from ..context import DetectionContext
+from ..models import RawCandidate, RawResult
 from .base import EngineBase
 from ..registry import register
 
@@ -18,24 +21,138 @@ _SIGS = {
         "application/vnd.oasis.opendocument.spreadsheet": ("application/vnd.oasis.opendocument.spreadsheet", "ods"),
     },
 }
+_PREFIXES = tuple(d.encode() for d in _SIGS["[Content_Types].xml"])
+
+# end of central directory record, its ZIP64 locator and ZIP64 record
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD64_LOC = struct.Struct("<4sLQL")
+_EOCD64 = struct.Struct("<4sQ2H2L4Q")
+# central directory file header and local file header
+_CDIR = struct.Struct("<4s6H3L5H2L")
+_LOCAL = struct.Struct("<4s5H3L2H")
+_MAX_COMMENT = 0xFFFF
+# upper bound on the bytes of a ``mimetype`` entry worth reading
+_MIMETYPE_MAX = 256
+
+
+class _BadZip(Exception):
+    pass
+
+
+def _directory(ctx: DetectionContext) -> tuple[int, int, int]:
+    """Return ``(offset, size, concat)`` of the central directory.
+
+    Only the tail of the file is read. ``concat`` is the number of bytes
+    prepended to the archive (self-extractors), added to every offset.
+    """
+    # the record and a possible ZIP64 locator right before it
+    tail = ctx.tail(_EOCD64_LOC.size + _EOCD.size)
+    pos = len(tail) - _EOCD.size
+    if pos < 0 or tail[pos : pos + 4] != b"PK\x05\x06":
+        # the record is followed by an archive comment
+        tail = ctx.tail(_EOCD64_LOC.size + _EOCD.size + _MAX_COMMENT)
+        pos = tail.rfind(b"PK\x05\x06")
+        if pos < 0 or len(tail) - pos < _EOCD.size:
+            raise _BadZip("no end of central directory record")
+    eocd_at = ctx.size - len(tail) + pos
+    (_, _, _, _, _, cd_size, cd_offset, _) = _EOCD.unpack_from(tail, pos)
+    trailer = eocd_at
+    loc = tail[max(pos - _EOCD64_LOC.size, 0) : pos]
+    if len(loc) == _EOCD64_LOC.size and loc[:4] == b"PK\x06\x07":
+        trailer = eocd_at - _EOCD64_LOC.size - _EOCD64.size
+        rec = ctx.read(trailer, _EOCD64.size) if trailer >= 0 else b""
+        if len(rec) != _EOCD64.size or rec[:4] != b"PK\x06\x06":
+            raise _BadZip("missing ZIP64 end of central directory")
+        cd_size, cd_offset = _EOCD64.unpack(rec)[-2:]
+    concat = trailer - cd_size - cd_offset
+    if concat < 0:
+        raise _BadZip("central directory offset out of range")
+    return cd_offset + concat, cd_size, concat
+
+
+def _entries(fh: io.BufferedReader, size: int):
+    """Yield ``(name, method, compressed size, header offset)`` per entry."""
+    left = size
+    while left >= _CDIR.size:
+        head = fh.read(_CDIR.size)
+        if len(head) != _CDIR.size or head[:4] != b"PK\x01\x02":
+            raise _BadZip("bad central directory entry")
+        fields = _CDIR.unpack(head)
+        method, csize, usize = fields[4], fields[8], fields[9]
+        nlen, elen, clen, offset = fields[10], fields[11], fields[12], fields[16]
+        name = fh.read(nlen)
+        extra = fh.read(elen)
+        fh.seek(clen, io.SEEK_CUR)
+        left -= _CDIR.size + nlen + elen + clen
+        if 0xFFFFFFFF in (csize, usize, offset):
+            # ZIP64 extra field: present values follow in this order
+            i = 0
+            while i + 4 <= len(extra):
+                tag, ln = struct.unpack_from("<2H", extra, i)
+                if tag == 1:
+                    vals = iter(struct.unpack_from(f"<{ln // 8}Q", extra, i + 4))
+                    if usize == 0xFFFFFFFF:
+                        usize = next(vals, usize)
+                    if csize == 0xFFFFFFFF:
+                        csize = next(vals, csize)
+                    if offset == 0xFFFFFFFF:
+                        offset = next(vals, offset)
+                    break
+                i += 4 + ln
+        yield name, method, csize, offset
+
+
+def _read_member(fh: io.BufferedReader, offset: int, method: int, csize: int) -> bytes:
+    """Return up to :data:`_MIMETYPE_MAX` bytes of a stored or deflated entry."""
+    fh.seek(offset)
+    head = fh.read(_LOCAL.size)
+    if len(head) != _LOCAL.size or head[:4] != b"PK\x03\x04":
+        raise _BadZip("bad local file header")
+    nlen, elen = _LOCAL.unpack(head)[-2:]
+    fh.seek(nlen + elen, io.SEEK_CUR)
+    data = fh.read(min(csize, _MIMETYPE_MAX))
+    if method == 8:
+        return zlib.decompressobj(-15).decompress(data, _MIMETYPE_MAX)
+    if method == 0:
+        return data
+    raise _BadZip(f"unsupported compression method {method}")
+
+
 @register
 class ZipOfficeEngine(EngineBase):
     name = "zipoffice"
     cost = 0.5
+    magic = ((b"PK\x03\x04", 0),)
 
-    def sniff(self, payload: bytes) -> Result:
+    def sniff(self, payload: bytes) -> RawResult:
         if not payload.startswith(b"PK\x03\x04"):
-            return Result(candidates=[])
+            return RawResult(candidates=[])
+        ctx = DetectionContext.of(payload)
         cand = []
         try:
-            with zipfile.ZipFile(io.BytesIO(payload)) as zf:
-                namelist = zf.namelist()
+            # only the end of central directory record, the directory itself
+            # and at most the ``mimetype`` member are read
+            cd_start, cd_size, concat = _directory(ctx)
+            with io.BufferedReader(ctx.reader()) as fh:
+                fh.seek(cd_start)
+                content_types = False
+                prefixes: set[bytes] = set()
+                mimetype = None
+                for name, method, csize, offset in _entries(fh, cd_size):
+                    if name == b"[Content_Types].xml":
+                        content_types = True
+                    elif name == b"mimetype":
+                        mimetype = (offset + concat, method, csize)
+                    elif name.startswith(_PREFIXES):
+                        prefixes.add(name[: name.index(b"/") + 1])
+                    if content_types and _PREFIXES[0] in prefixes:
+                        break  # nothing outranks a Word document
                 found_type = False
-                if "[Content_Types].xml" in namelist:
+                if content_types:
                     for dir_, (mime, ext) in _SIGS["[Content_Types].xml"].items():
-                        if any(n.startswith(dir_) for n in namelist):
+                        if dir_.encode() in prefixes:
                             cand.append(
-                                Candidate(
+                                RawCandidate(
                                     media_type=mime,
                                     extension=ext,
                                     confidence=score_tokens(1.0),
@@ -44,12 +161,12 @@ class ZipOfficeEngine(EngineBase):
                             )
                             found_type = True
                             break
-                if "mimetype" in namelist and not found_type:
-                    mime = zf.read("mimetype").decode(errors="ignore")
+                if mimetype is not None and not found_type:
+                    mime = _read_member(fh, *mimetype).decode(errors="ignore")
                     if mime in _SIGS["mimetype"]:
                         mt, ext = _SIGS["mimetype"][mime]
                         cand.append(
-                            Candidate(
+                            RawCandidate(
                                 media_type=mt,
                                 extension=ext,
                                 confidence=score_tokens(1.0),
@@ -59,7 +176,7 @@ class ZipOfficeEngine(EngineBase):
                         found_type = True
                 if not found_type:
                     cand.append(
-                        Candidate(
+                        RawCandidate(
                             media_type="application/zip",
                             extension="zip",
                             confidence=score_tokens(0.05),
@@ -67,6 +184,6 @@ class ZipOfficeEngine(EngineBase):
                         )
                     )
         except Exception:
-            cand.append(Candidate(media_type="application/zip", extension="zip", confidence=0.98))
-            return Result(candidates=cand, error="Couldn't read entire zip file")
-        return Result(candidates=cand)
+            cand.append(RawCandidate(media_type="application/zip", extension="zip", confidence=0.98))
+            return RawResult(candidates=cand, error="Couldn't read entire zip file")
+        return RawResult(candidates=cand)
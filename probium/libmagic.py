@@ -1,30 +1,70 @@
 from __future__ import annotations
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
 
+class MagicPool:
+    """Hand each thread its own libmagic cookie.
+
+    A ``magic.Magic`` handle wraps a single libmagic cookie that must not be
+    used from two threads at once, so python-magic serialises calls on it
+    with a lock. The pool opens one handle per thread instead, letting
+    libmagic-backed engines run in parallel across ``scan_dir`` workers.
+    libmagic maps the compiled database read-only, so every extra cookie
+    shares the same pages instead of loading another copy.
+    """
+
+    def __init__(self, factory) -> None:
+        self._factory = factory
+        self._local = threading.local()
+
+    def get(self):
+        """Return the calling thread's handle, opening it on first use."""
+        handle = getattr(self._local, "handle", None)
+        if handle is not None and self._local.pid == os.getpid():
+            return handle
+        handle = self._factory()
+        self._local.handle = handle
+        self._local.pid = os.getpid()
+        return handle
+
+    def from_buffer(self, buffer: bytes) -> str:
+        """Return the MIME type libmagic reports for ``buffer``."""
+        return self.get().from_buffer(buffer)
+
+
 _SENTINEL = object()
 _cached_magic: object | None = _SENTINEL
+_load_lock = threading.Lock()
 
 def load_magic():
-    """Return a cached libmagic detector or ``None`` if unavailable."""
+    """Return the shared libmagic :class:`MagicPool` or ``None`` if unavailable."""
     global _cached_magic
     if _cached_magic is not _SENTINEL:
         return _cached_magic  # type: ignore[return-value]
 
-    try:
-        import magic  # type: ignore
-    except Exception as exc:  # pragma: no cover - optional dep missing
-        logger.debug("python-magic not installed", exc_info=exc)
+    with _load_lock:
+        if _cached_magic is not _SENTINEL:
+            return _cached_magic  # type: ignore[return-value]
+        try:
+            import magic  # type: ignore
+        except Exception as exc:  # pragma: no cover - optional dep missing
+            logger.debug("python-magic not installed", exc_info=exc)
 
-        _cached_magic = None
-        return None
-    try:
-        _cached_magic = magic.Magic(mime=True)
-    except Exception as exc:  # pragma: no cover - runtime failure
+            _cached_magic = None
+            return None
+        pool = MagicPool(lambda: magic.Magic(mime=True))
+        try:
+            # open this thread's handle now so a broken libmagic is
+            # reported once here rather than on every call
+            pool.get()
+        except Exception as exc:  # pragma: no cover - runtime failure
 
-        logger.debug("libmagic unavailable", exc_info=exc)
-        _cached_magic = None
+            logger.debug("libmagic unavailable", exc_info=exc)
+            _cached_magic = None
+        else:
+            _cached_magic = pool
     return _cached_magic  # type: ignore[return-value]
-
@@ -6,10 +6,8 @@ import importlib.util
 from .models import Result
 from .scoring import score_magic
 
-from .cache import get as cache_get
-
-
 from .registry import get_instance
+from .signatures import SignatureIndex
 
 # tuples
 MAGIC_SIGNATURES: list[tuple[bytes, int, str]] = [
@@ -39,31 +37,47 @@ MAGIC_SIGNATURES: list[tuple[bytes, int, str]] = [
     (importlib.util.MAGIC_NUMBER, 0, "python"),
 ]
 
-_MAX_SCAN = max(off + len(sig) for sig, off, _ in MAGIC_SIGNATURES) + 1
+MAGIC_INDEX: SignatureIndex[str] = SignatureIndex(MAGIC_SIGNATURES)
+# bumped whenever a signature is registered at runtime; part of the
+# registry fingerprint so cached results do not outlive a routing change
+SIGNATURE_GENERATION = 0
+
+_MAX_SCAN = MAGIC_INDEX.max_end + 1
+
+
+def register_signature(sig: bytes, offset: int, engine: str) -> None:
+    """Route payloads starting with ``sig`` at ``offset`` to ``engine``.
+
+    Third-party engines can call this at import time to join the magic fast
+    path without adding a per-file cost for every extra signature.
+    """
+    global SIGNATURE_GENERATION
+    MAGIC_SIGNATURES.append((sig, offset, engine))
+    MAGIC_INDEX.add(sig, offset, engine)
+    SIGNATURE_GENERATION += 1
+
 
 def _load_bytes(source: str | Path | bytes, cap: int | None) -> bytes:
     if isinstance(source, (str, Path)):
-        p = Path(source)
-        cached = cache_get(p)
-        if isinstance(cached, (bytes, bytearray)):
-            return cached[:cap] if cap else bytes(cached)
-        data = p.read_bytes() if cap is None else p.read_bytes()[:cap]
-        return data
+        with Path(source).open("rb") as fh:
+            return fh.read() if cap is None else fh.read(cap)
     return source[:cap] if cap else source
 
 
 
 def detect_magic(source: str | Path | bytes, *, cap_bytes: int | None = None) -> Result:
     """Detect using custom magic signatures, falling back to normal detection."""
-    payload = _load_bytes(source, cap_bytes or _MAX_SCAN)
-    for sig, off, engine in MAGIC_SIGNATURES:
-        end = off + len(sig)
-        if len(payload) >= end and payload[off:end] == sig:
-            res = get_instance(engine)(payload)
-            if res.candidates:
-                res.candidates[0].breakdown = {"magic_len": float(len(sig))}
-                res.candidates[0].confidence = score_magic(len(sig))
-            return res
+    payload = _load_bytes(source, cap_bytes or MAGIC_INDEX.max_end + 1)
+    hit = MAGIC_INDEX.first(payload)
+    if hit is not None:
+        sig, _, engine = hit
+        res = get_instance(engine)(payload)
+        if res.candidates:
+            res.candidates[0] = res.candidates[0]._replace(
+                breakdown={"magic_len": float(len(sig))},
+                confidence=score_magic(len(sig)),
+            )
+        return res.to_model()
     # fallback to standard autodetection
 
     from .core import _detect_file as detect
@@ -0,0 +1,140 @@
+"""Persistent per-path scan state for incremental directory rescans."""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .cache import CACHE_DIR, _des, _ser, stat_sig
+from .models import Result
+
+logger = logging.getLogger(__name__)
+
+DB = CACHE_DIR / "manifest.sqlite3"
+
+_DB_TIMEOUT = 30.0
+
+# rows buffered before they are written in one transaction
+FLUSH_SIZE = 512
+
+_PUT = (
+    "INSERT OR REPLACE INTO f (k, p, m, s, i, d, g, j) VALUES (?,?,?,?,?,?,?,?)"
+)
+_TOUCH = "UPDATE f SET g = ? WHERE k = ? AND p = ?"
+
+
+def _init(con: sqlite3.Connection) -> None:
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    # k: scan scope, p: path, m/s/i/d: st_mtime_ns, st_size, st_ino, st_dev,
+    # g: generation the path was last seen in, j: Result JSON
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS f ("
+        "k TEXT, p TEXT, m INTEGER, s INTEGER, i INTEGER, d INTEGER, "
+        "g INTEGER, j TEXT, PRIMARY KEY (k, p))"
+    )
+    # last generation started for each scope
+    con.execute("CREATE TABLE IF NOT EXISTS n (k TEXT PRIMARY KEY, g INTEGER)")
+    con.commit()
+
+
+class Manifest:
+    """What a previous scan of one scope saw, and what this one has seen.
+
+    A scope names a scan root together with the options that affect its
+    results, so changing any of them starts from an empty manifest. Every
+    scan runs as a new generation: paths that are looked up and found
+    unchanged are stamped with it, and rows still carrying an older
+    generation once the walk is complete belong to removed files.
+    """
+
+    def __init__(self, scope: str, db: str | Path | None = None) -> None:
+        self.scope = scope
+        # the owning scan may be resumed from another thread, never two
+        # at once, so one connection is shared
+        self._con = sqlite3.connect(
+            db or DB, timeout=_DB_TIMEOUT, check_same_thread=False
+        )
+        _init(self._con)
+        with self._con:
+            row = self._con.execute(
+                "SELECT g FROM n WHERE k = ?", (scope,)
+            ).fetchone()
+            self.generation = (row[0] if row else 0) + 1
+            self._con.execute(
+                "INSERT OR REPLACE INTO n (k, g) VALUES (?, ?)",
+                (scope, self.generation),
+            )
+        self._puts: list[tuple] = []
+        self._touches: list[tuple] = []
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return os.path.abspath(path)
+
+    def lookup(self, path: Path) -> Optional[tuple[int, int, int, int]]:
+        """Return the stat signature ``path`` was recorded with, if any."""
+        row = self._con.execute(
+            "SELECT m, s, i, d FROM f WHERE k = ? AND p = ?",
+            (self.scope, self._key(path)),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def touch(self, path: Path) -> None:
+        """Mark an unchanged ``path`` as seen by this scan."""
+        self._touches.append((self.generation, self.scope, self._key(path)))
+        if len(self._touches) >= FLUSH_SIZE:
+            self.flush()
+
+    def record(self, path: Path, st: os.stat_result, result: Result) -> None:
+        """Store the ``result`` detected for ``path`` as of the stat ``st``."""
+        self._puts.append(
+            (
+                self.scope,
+                self._key(path),
+                *stat_sig(st),
+                self.generation,
+                _ser(result),
+            )
+        )
+        if len(self._puts) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows in a single transaction."""
+        if not (self._puts or self._touches):
+            return
+        with self._con:
+            if self._touches:
+                self._con.executemany(_TOUCH, self._touches)
+            if self._puts:
+                self._con.executemany(_PUT, self._puts)
+        self._puts = []
+        self._touches = []
+
+    def removed(self) -> Iterator[tuple[Path, Result]]:
+        """Yield and forget the paths this scan did not see.
+
+        Only call this once the walk has finished; each removed path comes
+        with the last result recorded for it.
+        """
+        self.flush()
+        rows = self._con.execute(
+            "SELECT p, j FROM f WHERE k = ? AND g < ?",
+            (self.scope, self.generation),
+        ).fetchall()
+        with self._con:
+            self._con.execute(
+                "DELETE FROM f WHERE k = ? AND g < ?", (self.scope, self.generation)
+            )
+        for raw_path, raw in rows:
+            yield Path(raw_path), _des(raw)
+
+    def close(self) -> None:
+        """Flush pending rows and close the database."""
+        try:
+            self.flush()
+        finally:
+            self._con.close()
@@ -1,15 +1,20 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 class Candidate(BaseModel):
     """Single MIME guess with an optional extension and confidence score.
 
+    Candidates are immutable so engines can hand out cached instances by
+    reference; use ``model_copy(update=...)`` to derive a changed one.
+
     Example
     -------
     ``Candidate(media_type="application/pdf", extension="pdf", confidence=0.92)``
     """
 
+    model_config = ConfigDict(frozen=True)
+
     media_type: str
     extension: Optional[str] = None
     confidence: float = Field(ge=0, le=1)
@@ -28,6 +33,85 @@ class Result(BaseModel):
     hash: str | None = None
 
 
+class RawCandidate(NamedTuple):
+    """Lightweight, immutable candidate used inside the engine chain.
+
+    Engines build these instead of :class:`Candidate` so the per-file hot
+    path does no validation; :meth:`to_model` converts at the API boundary.
+    """
+
+    media_type: str
+    extension: Optional[str] = None
+    confidence: float = 0.0
+    breakdown: Optional[Dict[str, Any]] = None
+
+    def to_model(self) -> Candidate:
+        return Candidate(
+            media_type=self.media_type,
+            extension=self.extension,
+            confidence=self.confidence,
+            breakdown=self.breakdown,
+        )
+
+    @classmethod
+    def from_model(cls, cand: Candidate) -> "RawCandidate":
+        return cls(cand.media_type, cand.extension, cand.confidence, cand.breakdown)
+
+
+class RawResult:
+    """Slotted counterpart of :class:`Result` returned by engines.
+
+    ``probium.core`` only converts the winning result with :meth:`to_model`,
+    so the dozens of engine calls per file never touch pydantic.
+    """
+
+    __slots__ = ("candidates", "error", "engine", "bytes_analyzed", "elapsed_ms", "hash")
+
+    def __init__(
+        self,
+        candidates: List[RawCandidate] | None = None,
+        error: str | None = None,
+        *,
+        engine: str = "",
+        bytes_analyzed: int = 0,
+        elapsed_ms: float = 0.0,
+        hash: str | None = None,
+    ) -> None:
+        self.candidates = candidates if candidates is not None else []
+        self.error = error
+        self.engine = engine
+        self.bytes_analyzed = bytes_analyzed
+        self.elapsed_ms = elapsed_ms
+        self.hash = hash
+
+    def to_model(self) -> Result:
+        return Result(
+            engine=self.engine,
+            bytes_analyzed=self.bytes_analyzed,
+            elapsed_ms=self.elapsed_ms,
+            candidates=[c.to_model() for c in self.candidates],
+            error=self.error,
+            hash=self.hash,
+        )
+
+    @classmethod
+    def from_model(cls, res: Result) -> "RawResult":
+        return cls(
+            [RawCandidate.from_model(c) for c in res.candidates],
+            res.error,
+            engine=res.engine,
+            bytes_analyzed=res.bytes_analyzed,
+            elapsed_ms=res.elapsed_ms,
+            hash=res.hash,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"RawResult(engine={self.engine!r}, candidates={self.candidates!r}, "
+            f"error={self.error!r})"
+        )
+
+
 class DetectionResult(BaseModel):
     """Flattened API payload returned by web/CLI commands."""
 
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 from types import MappingProxyType
 from importlib import import_module
 
@@ -7,12 +8,16 @@ from .exceptions import UnsupportedType
 
 _engines: dict[str, type] = {}
 _engine_instances: dict[str, "EngineBase"] = {}
+# (signature generation, fingerprint) for the current engine set
+_fingerprint: tuple[int, str] | None = None
 
 
 def register(cls):
     """Decorator to add an engine class to the global registry."""
 
+    global _fingerprint
     _engines[cls.name] = cls
+    _fingerprint = None
     return cls
 
 
@@ -48,3 +53,30 @@ def list_engines() -> list[str]:
         if not getattr(cls, "opt_in_only", False)
     ]
 all_engines = lambda: MappingProxyType(_engines)
+
+
+def fingerprint() -> str:
+    """Return a short digest identifying the registered engine set.
+
+    Cached results are tagged with it so installing or removing an engine
+    plugin, upgrading probium or registering a magic signature does not serve
+    results produced by a different engine chain.
+    """
+    global _fingerprint
+    # imported here: both modules import this one
+    from . import __version__, magic_service
+
+    generation = magic_service.SIGNATURE_GENERATION
+    current = _fingerprint
+    if current is None or current[0] != generation:
+        list_engines()
+        ident = ";".join(
+            [f"probium={__version__}", f"signatures={generation}"]
+            + [
+                f"{name}={cls.__module__}.{cls.__qualname__}@{getattr(cls, 'cost', 1.0)}"
+                for name, cls in sorted(_engines.items())
+            ]
+        )
+        current = (generation, hashlib.blake2b(ident.encode(), digest_size=8).hexdigest())
+        _fingerprint = current
+    return current[1]
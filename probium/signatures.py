@@ -0,0 +1,86 @@
+"""Compiled byte-signature index shared by the magic fast path and engines."""
+from __future__ import annotations
+
+import threading
+from typing import Generic, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# (signature, offset, value)
+Signature = tuple[bytes, int, T]
+
+
+class SignatureIndex(Generic[T]):
+    """Offset-bucketed first-byte dispatch table over byte signatures.
+
+    Signatures are grouped by the offset they must appear at and then by
+    their first byte, so matching a header costs one dictionary lookup per
+    distinct offset instead of one slice and compare per signature. The table
+    is rebuilt copy-on-write when signatures are added, which keeps
+    :meth:`match` lock free for concurrent scans.
+    """
+
+    def __init__(self, signatures: Iterable[Signature] = ()) -> None:
+        self._entries: list[Signature] = []
+        self._table: tuple[tuple[int, dict[int, tuple[tuple[bytes, T], ...]]], ...] = ()
+        self._lock = threading.Lock()
+        self.max_end = 0
+        self.extend(signatures)
+
+    def add(self, sig: bytes, offset: int, value: T) -> None:
+        """Register ``sig`` at ``offset`` mapping to ``value``."""
+        self.extend([(sig, offset, value)])
+
+    def extend(self, signatures: Iterable[Signature]) -> None:
+        """Register several signatures and rebuild the table once."""
+        new = []
+        for sig, offset, value in signatures:
+            if not sig:
+                raise ValueError("signature must not be empty")
+            if offset < 0:
+                raise ValueError("signature offset must be non-negative")
+            new.append((bytes(sig), offset, value))
+        if not new:
+            return
+        with self._lock:
+            self._entries.extend(new)
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        buckets: dict[int, dict[int, list[tuple[bytes, T]]]] = {}
+        for sig, offset, value in self._entries:
+            buckets.setdefault(offset, {}).setdefault(sig[0], []).append((sig, value))
+        table = []
+        for offset in sorted(buckets):
+            by_byte = {
+                first: tuple(sorted(items, key=lambda item: len(item[0]), reverse=True))
+                for first, items in buckets[offset].items()
+            }
+            table.append((offset, by_byte))
+        self.max_end = max(off + len(sig) for sig, off, _ in self._entries)
+        self._table = tuple(table)
+
+    def match(self, payload: bytes) -> list[Signature]:
+        """Return every signature found in ``payload``, longest first."""
+        size = len(payload)
+        hits: list[Signature] = []
+        for offset, by_byte in self._table:
+            if offset >= size:
+                break
+            for sig, value in by_byte.get(payload[offset], ()):
+                if payload.startswith(sig, offset):
+                    hits.append((sig, offset, value))
+        if len(hits) > 1:
+            hits.sort(key=lambda hit: len(hit[0]), reverse=True)
+        return hits
+
+    def first(self, payload: bytes) -> Signature | None:
+        """Return the longest signature found in ``payload`` or ``None``."""
+        hits = self.match(payload)
+        return hits[0] if hits else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Signature]:
+        return iter(list(self._entries))
@@ -24,8 +24,10 @@ class BaseModel:
     def model_validate_json(cls, raw: str):
         return cls(**json.loads(raw))
 
-    def model_copy(self, deep: bool = False):
-        return self.__class__(**self.__dict__)
+    def model_copy(self, *, update=None, deep: bool = False):
+        data = dict(self.__dict__)
+        data.update(update or {})
+        return self.__class__(**data)
 
 def Field(*, ge=None, le=None, default=None):
     return default
@@ -22,3 +22,579 @@ def test_watch_missing_root(tmp_path):
     missing = tmp_path / "missing"
     with pytest.raises(FileNotFoundError):
         watch(missing, lambda p, r: None)
+
+
+def test_signature_index_longest_first():
+    from probium.signatures import SignatureIndex
+
+    index = SignatureIndex([(b"PK", 0, "short"), (b"PK\x03\x04", 0, "long"), (b"ustar", 257, "tar")])
+    payload = b"PK\x03\x04" + b"\x00" * 253 + b"ustar"
+    assert [value for _, _, value in index.match(payload)] == ["tar", "long", "short"]
+    assert index.first(b"nothing") is None
+
+
+def test_cache_write_behind_flush(tmp_path, monkeypatch):
+    from probium import cache
+    from probium.models import Candidate, Result
+
+    cache.flush()
+    monkeypatch.setattr(cache, "DB", tmp_path / "results.sqlite3")
+    monkeypatch.setattr(cache, "_generation", cache._generation + 1)
+    cache._init_db()
+
+    target = tmp_path / "a.txt"
+    target.write_text("hi")
+    cache.put(target, Result(candidates=[Candidate(media_type="text/plain", confidence=1.0)]))
+    cache.flush()
+
+    key = str(target.resolve())
+    row = cache._connect().execute("SELECT p FROM r WHERE p = ?", (key,)).fetchone()
+    assert row == (key,)
+
+
+def test_cache_invalidated_by_rewrite(tmp_path):
+    target = tmp_path / "data.txt"
+    target.write_text("a,b,c\n1,2,3\n4,5,6\n7,8,9\n")
+    assert detect(target).candidates[0].media_type == "text/csv"
+
+    target.write_text('{"rewritten": [1, 2, 3], "in": "place"}')
+    assert detect(target).candidates[0].media_type == "application/json"
+
+
+def test_content_cache_shared_between_copies(tmp_path, monkeypatch):
+    import probium.core as core
+
+    data = (SAMPLES_DIR / "sample.csv").read_bytes()
+    first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+    first.write_bytes(data)
+    second.write_bytes(data)
+    expected = detect(first).candidates[0].media_type
+
+    def _no_engines(name):
+        raise AssertionError(f"engine {name} ran for duplicate content")
+
+    monkeypatch.setattr(core, "get_instance", _no_engines)
+    assert detect(second).candidates[0].media_type == expected
+
+
+def test_payload_hashed_once_per_detection(monkeypatch):
+    import probium.context as context
+
+    calls = []
+    real = context.payload_digest
+    monkeypatch.setattr(context, "payload_digest", lambda p: calls.append(1) or real(p))
+    res = detect(SAMPLES_DIR / "sample.csv", cache=False)
+    assert res.candidates[0].media_type == "text/csv"
+    assert len(calls) == 1
+
+
+def test_engine_cache_hit_shares_candidates():
+    from probium.registry import get_instance
+
+    engine = get_instance("csv")
+    data = (SAMPLES_DIR / "sample.csv").read_bytes()
+    first = engine(data)
+    first.candidates.clear()
+    second, third = engine(data), engine(data)
+    assert second.candidates and second.candidates[0] is third.candidates[0]
+    assert second is not third
+
+
+def test_pydantic_results_from_plugins_are_normalised():
+    from probium.engines.base import EngineBase
+    from probium.models import Candidate, RawResult, Result
+
+    class Plugin(EngineBase):
+        name = "plugin-test"
+
+        def sniff(self, payload):
+            return Result(candidates=[Candidate(media_type="x/test", confidence=0.5)])
+
+    raw = Plugin()(b"payload")
+    assert isinstance(raw, RawResult) and raw.engine == "plugin-test"
+    model = raw.to_model()
+    assert isinstance(model, Result) and model.candidates[0].media_type == "x/test"
+
+
+def test_prefilter_skips_engines_that_cannot_match():
+    from probium.context import DetectionContext
+    from probium.core import _select_engines
+
+    names = ["gzip", "png", "json", "csv", "tar", "python"]
+    binary = DetectionContext(b"\x1f\x8b\x08\x00" + b"\x00" * 64)
+    assert _select_engines(names, binary) == ["gzip", "python"]
+    text = DetectionContext(b'{"a": 1}')
+    assert _select_engines(names, text) == ["json", "csv", "python"]
+    assert not DetectionContext("﻿hi".encode("utf-16")).is_binary
+
+
+def test_text_analysis_shared_by_engines():
+    from probium.context import DetectionContext
+    from probium.registry import get_instance
+
+    ctx = DetectionContext(b"\xef\xbb\xbfname,value\nconsole.log(1)\n")
+    for name in ("js", "json", "lua", "text"):
+        get_instance(name)(ctx)
+    assert ctx.text is ctx.decode("utf-8", "ignore")
+    assert ctx.encoding == "utf-8-sig"
+    assert ctx.lines[0] == "﻿name,value"
+    assert ctx.printable_ratio < 1.0
+    assert DetectionContext(b"\xff\xfe").decode("utf-8", "strict") is None
+
+
+def test_libmagic_runs_once_per_detection(monkeypatch, tmp_path):
+    import probium.context as context
+
+    calls = []
+
+    class FakeMagic:
+        def from_buffer(self, data):
+            calls.append(len(data))
+            return "text/plain"
+
+    monkeypatch.setattr(context, "load_magic", lambda: FakeMagic())
+    path = tmp_path / "magic.csv"
+    path.write_text("a,b,c\n1,2,3\n4,5,6\n7,8,9\n")
+    res = detect(path, cache=False)
+    assert res.candidates
+    assert len(calls) == 1
+
+
+def test_magic_pool_hands_out_one_handle_per_thread():
+    import threading
+    from probium.libmagic import MagicPool
+
+    pool = MagicPool(object)
+    mine = pool.get()
+    assert pool.get() is mine
+    other = []
+    t = threading.Thread(target=lambda: other.append(pool.get()))
+    t.start()
+    t.join()
+    assert other and other[0] is not mine
+
+
+def test_walker_prunes_ignored_dirs_and_skips_symlink_loops(tmp_path):
+    from probium.core import _walk
+
+    (tmp_path / "src" / "skip").mkdir(parents=True)
+    (tmp_path / "src" / "a.txt").write_text("a")
+    (tmp_path / "src" / "skip" / "b.txt").write_text("b")
+    (tmp_path / "src" / "loop").symlink_to(tmp_path)
+    found = {p.relative_to(tmp_path).as_posix() for p in _walk(tmp_path, "**/*", {"skip"})}
+    assert found == {"src", "src/a.txt", "src/loop"}
+    assert {p.name for p in _walk(tmp_path, "*/*.txt", set())} == {"a.txt"}
+
+
+def test_scan_dir_bounds_in_flight_files(tmp_path, monkeypatch):
+    import probium.core as core
+
+    for i in range(20):
+        (tmp_path / f"f{i}.txt").write_text("hello")
+    walked = []
+    real_walk = core._walk
+
+    def counting_walk(*args):
+        for p in real_walk(*args):
+            walked.append(p)
+            yield p
+
+    monkeypatch.setattr(core, "_walk", counting_walk)
+    results = core.scan_dir(tmp_path, workers=1, max_pending=2, cache=False)
+    next(results)
+    assert len(walked) <= 3
+    assert len(list(results)) == 19
+
+
+def test_scan_dir_process_chunks_match_threads():
+    from probium.core import scan_dir
+
+    def run(**kw):
+        return sorted(
+            (p.name, r.candidates[0].media_type)
+            for p, r in scan_dir(SAMPLES_DIR, cache=False, **kw)
+        )
+
+    assert run(processes=2, chunk_size=7, max_pending=10) == run(workers=2)
+
+
+def test_scan_dir_async_uses_fixed_consumer_pool(tmp_path):
+    import asyncio
+    from probium.core import scan_dir_async
+
+    for i in range(40):
+        (tmp_path / f"f{i}.txt").write_text(f"hello {i}")
+
+    async def run():
+        peak, seen = 0, 0
+        async for _ in scan_dir_async(tmp_path, workers=2, max_pending=4, cache=False):
+            peak = max(peak, len(asyncio.all_tasks()))
+            seen += 1
+        return peak, seen
+
+    peak, seen = asyncio.run(run())
+    assert seen == 40
+    # the test's own task, the walker and two consumers
+    assert peak <= 4
+
+    async def run_processes():
+        # options the CLI always passes must not clash with worker defaults
+        return [
+            res
+            async for _, res in scan_dir_async(
+                tmp_path, processes=2, cap_bytes=4096, engine="auto", cache=False
+            )
+        ]
+
+    results = asyncio.run(run_processes())
+    assert len(results) == 40
+    assert all(res.candidates for res in results)
+
+
+def test_scan_dir_ordered_yields_in_walk_order(tmp_path):
+    import asyncio
+    from probium.core import _walk, scan_dir, scan_dir_async
+
+    for d in ("b", "a"):
+        (tmp_path / d).mkdir()
+        for i in range(12):
+            (tmp_path / d / f"{i:02}.txt").write_text("x" * i)
+    expected = list(_walk(tmp_path, "**/*", set(), sort=True))
+
+    def run(**kw):
+        return [p for p, _ in scan_dir(tmp_path, ordered=True, cache=False, **kw)]
+
+    assert run(workers=4, max_pending=3) == expected
+    assert run(processes=2, chunk_size=5) == expected
+
+    async def run_async():
+        return [
+            p
+            async for p, _ in scan_dir_async(
+                tmp_path, workers=4, max_pending=3, ordered=True, cache=False
+            )
+        ]
+
+    assert asyncio.run(run_async()) == expected
+
+
+def test_incremental_scan_reports_deltas(tmp_path, monkeypatch):
+    import os
+    import probium.core as core
+
+    root = tmp_path / "tree"
+    root.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (root / name).write_text(name)
+    db = tmp_path / "manifest.sqlite3"
+
+    def run():
+        return {
+            (change, p.name)
+            for change, p, _ in core.scan_dir_incremental(
+                root, workers=2, cache=False, manifest_db=db
+            )
+        }
+
+    assert run() == {("added", "a.txt"), ("added", "b.txt"), ("added", "c.txt")}
+    detected = []
+    real = core._detect_file
+    monkeypatch.setattr(
+        core, "_detect_file", lambda p, **kw: detected.append(p.name) or real(p, **kw)
+    )
+    assert run() == set()
+    assert detected == []
+
+    (root / "b.txt").write_text("changed contents")
+    os.utime(root / "b.txt", ns=(1, 1))
+    (root / "c.txt").unlink()
+    (root / "d.txt").write_text("d")
+    assert run() == {("changed", "b.txt"), ("removed", "c.txt"), ("added", "d.txt")}
+    assert sorted(detected) == ["b.txt", "d.txt"]
+    assert run() == set()
+
+
+def test_large_files_are_mapped_not_read(tmp_path):
+    import mmap
+    import os
+    import zipfile
+    from probium.context import MAP_THRESHOLD
+    from probium.core import _load_context
+
+    path = tmp_path / "big.docx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr("word/document.xml", "<w:document/>")
+        zf.writestr("word/media/blob.bin", os.urandom(2 * MAP_THRESHOLD))
+    ctx = _load_context(path, 10_000_000)
+    assert isinstance(ctx.data, mmap.mmap)
+    assert len(ctx.payload) == MAP_THRESHOLD
+    assert len(ctx) == path.stat().st_size
+    assert ctx.view[:2] == b"PK"
+
+
+def test_trailer_formats_use_head_and_tail_reads(tmp_path):
+    import os
+    import zipfile
+    from probium.context import DetectionContext
+    from probium.engines.pdf import PDFEngine
+
+    path = tmp_path / "big.docx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        zf.writestr("word/media/blob.bin", os.urandom(200_000))
+        zf.writestr("word/document.xml", "<w:document/>")
+    res = detect(path, cache=False)
+    assert res.candidates[0].extension == "docx"
+    assert res.bytes_analyzed == 4096
+
+    body = b"%PDF-1.7\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n"
+    body += b"3 0 obj\n<< /Length 1 >>\nstream\n" + b"x" * 300_000 + b"\nendstream\nendobj\n"
+    body += b"xref\n0 1\ntrailer\n<< /Root 1 0 R >>\nstartxref\n12\n%%EOF\n"
+    pdf = tmp_path / "big.pdf"
+    pdf.write_bytes(body)
+    ctx = DetectionContext(body[:4096], source=pdf, size=len(body))
+    assert ctx.tail(6) == b"%%EOF\n"
+    assert ctx.range_reads == 1
+    assert ctx.tail(6) is ctx.tail(6)
+    assert PDFEngine()(ctx).candidates[0].media_type == "application/pdf"
+    assert detect(pdf, cache=False).candidates[0].extension == "pdf"
+
+
+def test_zip_office_reads_only_the_central_directory(tmp_path):
+    import os
+    import zipfile
+    from probium.context import DetectionContext
+    from probium.engines.zip_office import ZipOfficeEngine
+
+    def build(name, entries, **kw):
+        path = tmp_path / name
+        with zipfile.ZipFile(path, "w", **kw) as zf:
+            for entry, data in entries:
+                zf.writestr(entry, data)
+        return path
+
+    blob = ("xl/media/blob.bin", os.urandom(300_000))
+    paths = {
+        "xlsx": build("a.bin", [("[Content_Types].xml", "<Types/>"), blob, ("xl/workbook.xml", "<w/>")]),
+        "odt": build(
+            "b.bin",
+            [("mimetype", "application/vnd.oasis.opendocument.text"), blob],
+            compression=zipfile.ZIP_DEFLATED,
+        ),
+        "zip": build("c.bin", [blob]),
+    }
+    for ext, path in paths.items():
+        data = path.read_bytes()
+        ctx = DetectionContext(data[:4096], source=path, size=len(data))
+        res = ZipOfficeEngine()(ctx)
+        assert res.error is None
+        assert res.candidates[0].extension == ext
+        # the tail, the directory and at most the mimetype member
+        assert ctx.range_reads <= 3
+
+
+def test_pdf_scanner_is_bounded_and_single_pass():
+    from probium.context import DetectionContext
+    from probium.engines import pdf
+
+    body = b"%PDF-1.4\n" + b"stream " * 200_000
+    ctx = DetectionContext(body)
+    assert sum(map(len, pdf._windows(ctx))) <= pdf.HEAD_WINDOW + pdf.TAIL_WINDOW
+    assert pdf.PDFEngine()(ctx).candidates == []
+    # without a version header nothing past the payload is read
+    plain = DetectionContext(b"x" * 4096, size=1 << 20)
+    assert pdf._windows(plain) == [plain.payload]
+
+    # features pair up across the head and tail windows
+    head = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nxref\n"
+    tail = b"endobj\nstartxref\n123\n%%EOF\n"
+    assert pdf._structure([head, tail]) == pdf.THRESHOLD
+    assert pdf._structure([b"12345678 obj endobj"]) == 0
+
+
+def test_legacy_office_reads_only_directory_sectors():
+    from probium.context import DetectionContext
+    from probium.engines.legacy_office import LegacyOfficeEngine
+
+    expected = {"998002.doc": "doc", "998045.xls": "xls", "998029.ppt": "ppt"}
+    for name, ext in expected.items():
+        path = SAMPLES_DIR / name
+        data = path.read_bytes()
+        ctx = DetectionContext(data[:4096], source=path, size=len(data))
+        res = LegacyOfficeEngine()(ctx)
+        assert res.candidates[0].extension == ext
+        assert ctx.range_reads < len(data) // 512 // 4
+
+    # a root entry whose child points back at itself
+    header = bytearray(512)
+    header[:8] = LegacyOfficeEngine._MAGIC
+    header[0x1E] = 9
+    header[0x30:0x34] = (0).to_bytes(4, "little")
+    header[0x4C:0x50] = (1).to_bytes(4, "little")
+    root = bytearray(512)
+    root[0x42] = 5
+    root[0x44:0x50] = b"\xff" * 8 + (0).to_bytes(4, "little")
+    fat = bytearray(b"\xfe\xff\xff\xff" * 128)
+    res = LegacyOfficeEngine()(bytes(header + root + fat))
+    assert res.candidates[0].extension == "cfb"
+    assert res.candidates[0].confidence == 0.5
+
+
+def test_csv_delimiters_scored_in_one_pass():
+    from probium.engines.csv import CSVEngine
+
+    eng = CSVEngine()
+    rows = "\n".join(f"{i};name {i};{i * 2}" for i in range(100))
+    delim, parsed = eng._split_rows("id;name;double\n" + rows)
+    assert delim == ";"
+    # agreement on the first rows settles the delimiter
+    assert len(parsed) == CSVEngine.AGREE_ROWS
+
+    delim, has_header, *_ = eng._analyze_sample('a,b\n"x\ny",1\nz,2\nw,3\n')
+    assert (delim, has_header) == (",", True)
+    assert eng._split_rows("one\ntwo, three\nfour\n")[0] is None
+
+
+def test_json_scan_is_structural_and_bounded():
+    from probium.engines import json as json_engine
+    from probium.engines.json import JSONEngine, _scan
+
+    doc = '{"a": [1, -2.5e3, true, null, "x\\u00e9"], "b": {}}'
+    assert _scan(doc, 0, len(doc)) == (json_engine.DONE, len(doc))
+    assert _scan(doc[:20], 0, 20) == (json_engine.MORE, 20)
+    assert _scan('{"a" 1}', 0, 7) == (None, 5)
+    assert _scan("[1,]", 0, 4) == (None, 3)
+
+    # a capped read of a large document is still recognised
+    big = ("[" + ", ".join(['{"k": "v"}'] * 2000) + "]").encode()
+    res = JSONEngine()(big[:4096])
+    assert res.candidates[0].breakdown["partial"] is True
+
+    # brace-heavy logs are rejected without walking past the budget
+    log = b"[2024-01-01] {event=x} {" * 40000
+    assert JSONEngine()(log).candidates == []
+
+
+def test_xml_parse_stops_after_root_and_children():
+    from probium.engines.xml import XMLEngine
+
+    eng = XMLEngine()
+    svg = '<svg xmlns="http://www.w3.org/2000/svg">' + '<rect x="1"/>' * 5
+    # nothing past the first slice fed to the parser is looked at
+    junk = " " * XMLEngine.FEED_SIZE + "</oops>"
+    assert eng._parse_prefix(svg + junk, whole=True)
+    assert not eng._parse_prefix(svg[:60] + junk, whole=True)
+
+    assert eng._parse_prefix("<a>1</a><b>2</b>", whole=True)
+    assert not eng._parse_prefix("<r><c></r>", whole=True)
+    assert not eng._parse_prefix("<r><c>", whole=True)
+    assert eng._parse_prefix("<r><c>", whole=False)
+
+
+def test_non_pdf_past_the_cap_is_not_range_read(tmp_path, monkeypatch):
+    import os
+    import probium.core as core
+    from probium.context import DetectionContext
+    from probium.engines.pdf import PDFEngine
+
+    path = tmp_path / "app.log"
+    # unique content, so the persistent content cache cannot already hold it
+    line = f"2024-01-01 INFO request {os.urandom(4).hex()} served in 3 ms\n"
+    path.write_text(line * 3600)
+    data = path.read_bytes()
+    ctx = DetectionContext(data[:4096], source=path, size=len(data))
+    assert PDFEngine()(ctx).candidates == []
+    assert ctx.range_reads == 0
+
+    puts = []
+    real = core.cache_put_content
+    monkeypatch.setattr(core, "cache_put_content", lambda *a, **k: puts.append(1) or real(*a, **k))
+    detect(path)
+    assert len(puts) == 1
+
+
+def test_scan_dir_processes_persist_cache_rows(tmp_path):
+    from probium import cache
+    from probium.core import scan_dir
+
+    for i in range(8):
+        (tmp_path / f"f{i}.txt").write_text(f"file number {i}\n")
+    results = list(scan_dir(tmp_path, processes=2))
+    assert len(results) == 8
+
+    def rows(root):
+        return cache._connect().execute(
+            "SELECT COUNT(*) FROM r WHERE p LIKE ?", (f"{root}%",)
+        ).fetchone()[0]
+
+    assert rows(tmp_path) == 8
+
+    # the async scan hands workers one file at a time; rows are still
+    # written once the pool shuts down
+    import asyncio
+    from probium.core import scan_dir_async
+
+    other = tmp_path / "async"
+    other.mkdir()
+    for i in range(8):
+        (other / f"g{i}.txt").write_text(f"async file {i}\n")
+
+    async def run():
+        return [r async for r in scan_dir_async(other, processes=2)]
+
+    assert len(asyncio.run(run())) == 8
+    assert rows(other) == 8
+
+
+def test_truncated_json_does_not_share_results_with_its_prefix(tmp_path):
+    import os
+
+    salt = int.from_bytes(os.urandom(3), "little")
+    body = ("[" + ", ".join(str(salt + i) for i in range(5000)) + "]").encode()
+    prefix, full = tmp_path / "prefix.txt", tmp_path / "full.txt"
+    prefix.write_bytes(body[:4096])
+    full.write_bytes(body)
+
+    alone = detect(prefix, cache=False).candidates[0].media_type
+    res = detect(full, cache=False)
+    assert res.candidates[0].media_type == "application/json"
+    # the size only goes into cache keys, never into the reported hash
+    int(res.hash, 16)
+    assert detect(prefix, cache=False).candidates[0].media_type == alone
+    assert alone != "application/json"
+
+
+def test_truncated_xml_does_not_share_results_with_its_prefix(tmp_path):
+    import os
+
+    # comments keep the tag density up without adding child elements
+    body = f"<r id='{os.urandom(4).hex()}'>{'<!-- c -->' * 600}</r>".encode()
+    prefix, full = tmp_path / "prefix.xml", tmp_path / "full.xml"
+    prefix.write_bytes(body[:4096])
+    full.write_bytes(body)
+
+    def parsed(path):
+        res = detect(path, engine="xml", cache=False)
+        return "parsed" in res.candidates[0].breakdown
+
+    assert not parsed(prefix)
+    assert parsed(full)
+    assert not parsed(prefix)
+
+
+def test_fingerprint_tracks_version_and_signatures(monkeypatch):
+    import probium
+    from probium import magic_service, registry
+
+    before = registry.fingerprint()
+    monkeypatch.setattr(magic_service, "MAGIC_SIGNATURES", list(magic_service.MAGIC_SIGNATURES))
+    monkeypatch.setattr(magic_service, "MAGIC_INDEX", magic_service.SignatureIndex(magic_service.MAGIC_SIGNATURES))
+    monkeypatch.setattr(magic_service, "SIGNATURE_GENERATION", magic_service.SIGNATURE_GENERATION)
+    magic_service.register_signature(b"\x00PROBIUMTEST", 0, "text")
+    after = registry.fingerprint()
+    assert after != before
+
+    monkeypatch.setattr(probium, "__version__", "999.0")
+    monkeypatch.setattr(registry, "_fingerprint", None)
+    assert registry.fingerprint() != after